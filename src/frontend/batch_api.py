@@ -0,0 +1,169 @@
+"""
+This module contains the helpers to run chat completion requests through the Azure OpenAI Batch API.
+Requests are written to JSONL files as they are produced, then uploaded, submitted and polled, and
+their results are mapped back by custom id.
+
+Only the `files` and `batches` endpoints of the client are used, so a local stand-in implementing
+them can replace Azure OpenAI, e.g. in tests.
+"""
+
+import os
+import json
+import time
+import tempfile
+
+BATCH_POLL_SECS = 60
+BATCH_MAX_FILE_MB = 190  # Azure OpenAI limits batch input files to 200 MB
+BATCH_FINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+BATCH_MAX_POLL_ERRORS = 10  # consecutive polling errors after which a batch is given up
+
+#
+class BatchWriter:
+    """
+    Writes chat completion requests to JSONL batch input files as they are added.
+
+    Requests are not kept in memory, which matters for image requests carrying base64 data URLs.
+    A new file is started whenever the current one would exceed `max_file_mb`.
+    """
+
+    def __init__(self, batch_dir, max_file_mb=BATCH_MAX_FILE_MB):
+        self.batch_dir = batch_dir
+        self.max_file_bytes = int(max_file_mb * 1024 * 1024)
+        self.batch_files = []
+        self.custom_ids = []
+        self._file = None
+        os.makedirs(batch_dir, exist_ok=True)
+
+    def __len__(self):
+        return len(self.custom_ids)
+
+    def add(self, custom_id, body):
+        """
+        Appends a request to the batch input files.
+
+        Args:
+            custom_id (str): Unique id used to map the result back to the request.
+            body (dict): Chat completion parameters of the request.
+        """
+        line = (json.dumps({
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/chat/completions",
+            "body": body,
+        }) + "\n").encode("utf-8")
+
+        if self._file is None or (self._file.tell() > 0 and self._file.tell() + len(line) > self.max_file_bytes):
+            self.close()
+            fd, batch_file = tempfile.mkstemp(dir=self.batch_dir, prefix="batch_", suffix=".jsonl")
+            self._file = os.fdopen(fd, "wb")
+            self.batch_files.append(batch_file)
+
+        self._file.write(line)
+        self.custom_ids.append(custom_id)
+
+    def close(self):
+        """Closes the current batch input file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+#
+def run_batch(writer, client, poll_secs=BATCH_POLL_SECS):
+    """
+    Runs the requests of a BatchWriter through the Batch API and returns their results.
+
+    The input files are uploaded and submitted as batches, which are polled until they are over.
+    The output and error files are then downloaded and each result is mapped back to its request
+    by custom id. The errors of the batches that failed as a whole are reported too.
+
+    A polling error, e.g. a timeout or a throttled request, is reported and the batch is polled
+    again, until `BATCH_MAX_POLL_ERRORS` errors in a row. If the run is aborted, including with
+    Ctrl-C, the batches still pending are cancelled, so that they are not left running and billed.
+
+    Args:
+        writer (BatchWriter): The requests to run.
+        client (AzureOpenAI): Client exposing the `files` and `batches` endpoints.
+        poll_secs (int, optional): Delay between two status checks. Defaults to `BATCH_POLL_SECS`.
+
+    Returns:
+        dict: The content of the completion of each request keyed by custom id, or None for
+              the requests that failed.
+    """
+    writer.close()
+    results = {custom_id: None for custom_id in writer.custom_ids}
+
+    pending = []
+    poll_errors = {}
+    try:
+        # Upload and submit
+        for batch_file in writer.batch_files:
+            with open(batch_file, "rb") as f:
+                input_file = client.files.create(file=f, purpose="batch")
+            batch = client.batches.create(
+                input_file_id=input_file.id,
+                endpoint="/chat/completions",
+                completion_window="24h",
+            )
+            print(f"Submitted batch {batch.id} from {batch_file}")
+            pending.append(batch.id)
+
+        # Poll until every batch is over, then map the results back
+        while pending:
+            for batch_id in list(pending):
+                try:
+                    batch = client.batches.retrieve(batch_id)
+                    if batch.status not in BATCH_FINAL_STATUSES:
+                        poll_errors.pop(batch_id, None)
+                        continue
+                    contents = [
+                        client.files.content(file_id).text
+                        for file_id in (getattr(batch, "output_file_id", None), getattr(batch, "error_file_id", None))
+                        if file_id
+                    ]
+                except Exception as e: # pylint: disable=broad-except
+                    poll_errors[batch_id] = poll_errors.get(batch_id, 0) + 1
+                    print(f"Error: Cannot poll batch {batch_id} "
+                          f"({poll_errors[batch_id]}/{BATCH_MAX_POLL_ERRORS}): {e}")
+                    if poll_errors[batch_id] >= BATCH_MAX_POLL_ERRORS:
+                        pending.remove(batch_id)
+                        _cancel_batches(client, [batch_id])
+                    continue
+
+                pending.remove(batch_id)
+                print(f"Batch {batch_id} is {batch.status}")
+
+                # Errors of a batch rejected as a whole, e.g. an invalid input file
+                errors = getattr(batch, "errors", None)
+                for error in getattr(errors, "data", None) or []:
+                    print(f"Error: Batch {batch_id} failed: {getattr(error, 'code', None)} "
+                          f"{getattr(error, 'message', None)} (line {getattr(error, 'line', None)})")
+
+                for content in contents:
+                    for line in content.splitlines():
+                        if not line.strip():
+                            continue
+                        result = json.loads(line)
+                        response = result.get("response") or {}
+                        if response.get("status_code") == 200:
+                            results[result["custom_id"]] = response["body"]["choices"][0]["message"]["content"]
+                        else:
+                            print(f"Error: Request {result['custom_id']} failed: {result.get('error') or response}")
+
+            if pending:
+                time.sleep(poll_secs)
+
+    except BaseException:
+        _cancel_batches(client, pending)
+        raise
+
+    return results
+
+#
+def _cancel_batches(client, batch_ids):
+    """Cancels batches, reporting the ones that cannot be cancelled so they can be cancelled by hand."""
+    for batch_id in batch_ids:
+        try:
+            client.batches.cancel(batch_id)
+            print(f"Cancelled batch {batch_id}")
+        except Exception as e: # pylint: disable=broad-except
+            print(f"Error: Cannot cancel batch {batch_id}: {e}")
@@ -0,0 +1,78 @@
+'''
+Offline bulk mode for VANTAGE Genie Accelerator
+
+Regenerates the SOP documents of many videos at once through the Azure OpenAI Batch API.
+Latency is traded for throughput and cost, and the batch requests do not compete with the
+interactive quota of the Streamlit app.
+
+Usage:
+    python bulk_sop.py <video url> [<video url> ...] [--images-per-step 3] [--language en-US]
+'''
+import argparse
+import os
+import shutil
+import helpers
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Generate SOP documents in bulk with the Azure OpenAI Batch API")
+    parser.add_argument("videos", nargs="+", help="URLs of the video files to process")
+    parser.add_argument("--language", default="en-US", help="Language in the videos for Azure Speech to Text")
+    parser.add_argument("--images-per-step", type=int, default=3, help="Number of frames per checklist step")
+    parser.add_argument("--poll-secs", type=int, default=helpers.BATCH_POLL_SECS, help="Delay between two batch status checks")
+    args = parser.parse_args()
+
+    store = helpers.ArtifactStore()
+
+    # Audio, transcripts, frames, batch files and documents of this run are produced in their own directory
+    RESULTS_DIR = store.staging_dir()
+
+    # Download, extract audio and transcribe every video
+    # The videos are pinned, since frames are extracted from them only once the step batch is over
+    videos = []
+    video_keys = []
+    try:
+        for src_video_file in args.videos:
+            video_key, video_file, _ = store.fetch_url(src_video_file)
+            store.pin(video_key)
+            video_keys.append(video_key)
+
+            audio_key = store.derived_key("audio", video_key, format="wav")
+            audio_file = store.get(audio_key)
+            if audio_file is None:
+                audio_file = store.put_file(audio_key, helpers.get_audio_file(video_file, RESULTS_DIR), "audio")
+
+            transcript_key = store.derived_key("transcript", audio_key, locale=args.language)
+            transcript_file = store.get(transcript_key)
+            if transcript_file is None:
+                _, _, words = helpers.azure_text_to_speech(audio_file, args.language, as_store=True)
+                transcript_file = os.path.join(
+                    RESULTS_DIR,
+                    os.path.splitext(os.path.basename(video_file))[0] + ".txt")
+                words.to_dataframe().to_csv(transcript_file)
+                store.put_file(transcript_key, transcript_file, "transcript")
+            else:
+                words = helpers.WordStore.read_csv(transcript_file)
+
+            videos.append((video_file, words))
+
+        # Step extraction, captions and OCR through the Batch API
+        docx_files = helpers.batch_checklist_docx_files(
+            videos, RESULTS_DIR, args.images_per_step, poll_secs=args.poll_secs)
+
+        for src_video_file, video_key, docx_file in zip(args.videos, video_keys, docx_files):
+            if docx_file is None:
+                print(f"Failed: {src_video_file}")
+                continue
+            docx_file = store.put_file(
+                store.derived_key("docx", video_key, locale=args.language, nb_images_per_step=args.images_per_step),
+                docx_file, "docx")
+            print(f"{src_video_file} -> {docx_file}")
+
+    finally:
+        for video_key in video_keys:
+            store.unpin(video_key)
+        shutil.rmtree(RESULTS_DIR, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
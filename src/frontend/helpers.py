@@ -12,13 +12,30 @@ import datetime
 import json
 import time
 import re
+import bisect
+import hashlib
+import shutil
+import subprocess
+import tempfile
+import threading
+from collections.abc import Sequence
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from mimetypes import guess_type
+from urllib.parse import urlparse
+
+try:
+    import fcntl
+except ImportError:  # Windows, where the artifact store is only locked within a process
+    fcntl = None
 
 import requests
 import librosa
 import cv2
+import imageio_ffmpeg
 import streamlit as st
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
 
 from docx import Document
@@ -31,6 +48,8 @@ from dotenv import find_dotenv, load_dotenv
 import azure.cognitiveservices.speech as speechsdk
 from azure.identity import DefaultAzureCredential, get_bearer_token_provider
 
+from batch_api import BATCH_POLL_SECS, BatchWriter, run_batch
+
 # Checking if the azd config file exists.
 # If so, use it to source env variables for local execution
 CONFIG_PATH = '../../.azure/config.json'
@@ -58,34 +77,373 @@ AZURE_SPEECH_RESOURCE_ID = os.getenv("AZURE_SPEECH_RESOURCE_ID")
 AZURE_OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
 AZURE_OPENAI_DEPLOYMENT_NAME = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME")
 
-if os.getenv("AZURE_OPENAI_KEY"):
-    print("Using Azure OpenAI Key")
-    OPEANAI_CLIENT = AzureOpenAI(azure_endpoint=AZURE_OPENAI_ENDPOINT,
-                        api_key=os.getenv("AZURE_OPENAI_KEY"),
-                        api_version="2024-02-01")
-else:
-    print("Using Azure AD Token Provider")
-    OPEANAI_CLIENT = AzureOpenAI(azure_endpoint=AZURE_OPENAI_ENDPOINT,
-                        azure_ad_token_provider=get_bearer_token_provider(DefaultAzureCredential(),"https://cognitiveservices.azure.com/.default"),
-                        api_version="2024-06-01")
+# Created on first use, so that this module can be imported without Azure configuration (e.g. in tests)
+OPEANAI_CLIENT = None
+
+def _openai_client():
+    """Returns the Azure OpenAI client, creating it on first use."""
+    global OPEANAI_CLIENT
+    if OPEANAI_CLIENT is None:
+        if os.getenv("AZURE_OPENAI_KEY"):
+            print("Using Azure OpenAI Key")
+            OPEANAI_CLIENT = AzureOpenAI(azure_endpoint=AZURE_OPENAI_ENDPOINT,
+                                api_key=os.getenv("AZURE_OPENAI_KEY"),
+                                api_version="2024-02-01")
+        else:
+            print("Using Azure AD Token Provider")
+            OPEANAI_CLIENT = AzureOpenAI(azure_endpoint=AZURE_OPENAI_ENDPOINT,
+                                azure_ad_token_provider=get_bearer_token_provider(DefaultAzureCredential(),"https://cognitiveservices.azure.com/.default"),
+                                api_version="2024-06-01")
+    return OPEANAI_CLIENT
 
 print(f"Azure OpenAI endpoint (helpers): {AZURE_OPENAI_ENDPOINT}")
 
+# Azure Speech reports offsets and durations in 100 ns ticks
+TICKS_PER_SECOND = 10_000_000
+
+# Media index (container metadata and keyframe table) cache location
+MEDIA_INDEX_DIR = os.getenv("MEDIA_INDEX_DIR", "../results/media_index")
+MEDIA_INDEX_VERSION = 1
+MEDIA_INDEX_RETRY_SECS = 600  # delay before probing again the keyframes of a video after a failure
+_MEDIA_INDEX_CACHE = {}
+_MEDIA_INDEX_FAILURES = {}  # key -> (retry after timestamp, index without keyframes)
+
+# Artifact store (downloads and derived artifacts) location and disk quota
+ARTIFACTS_DIR = os.getenv("ARTIFACTS_DIR", "../data/artifacts")
+ARTIFACTS_QUOTA_MB = int(os.getenv("ARTIFACTS_QUOTA_MB", "10240"))
+
+# Azure OpenAI Batch mode. The endpoint can point to a local stand-in for testing.
+AZURE_OPENAI_BATCH_ENDPOINT = os.getenv("AZURE_OPENAI_BATCH_ENDPOINT", AZURE_OPENAI_ENDPOINT)
+AZURE_OPENAI_BATCH_DEPLOYMENT_NAME = os.getenv("AZURE_OPENAI_BATCH_DEPLOYMENT_NAME", AZURE_OPENAI_DEPLOYMENT_NAME)
+
+# Prompts
+SOP_STEPS_PROMPT = """
+Describe the main steps of this checklist document.
+Extract all the specific steps. Please be precise and concise.
+
+### Output must have following properties:
+- Step: step number
+- Title: Generate a simple summary of the step
+- Summary: Generate a summary of the step in 2 or 3 lines
+- Keywords: generate some keywords to explain the step
+- Offset: offset
+- Offset_in_secs: offset in seconds
+
+### Here is an example:
+{
+    "Steps": [
+        {
+            "Step": 1,
+            "Title": "Introduction",
+            "Summary": "Provide an overview of the checklist document, including its purpose and scope.",
+            "Keywords": [
+                "overview",
+                "purpose",
+                "scope"
+            ],
+            "Offset": 5900000,
+            "Offset_in_secs": 0.59
+        },
+        {
+            "Step": 2,
+            "Title": "Preparation",
+            "Summary": "Outline the necessary preparations before starting the main tasks, such as gathering materials and setting up the environment.",
+            "Keywords": [
+                "preparation",
+                "materials",
+                "setup"
+            ],
+            "Offset": 183300000,
+            "Offset_in_secs": 18.33
+        }
+    ]
+}
+"""
+CAPTION_PROMPT = "Generate a detailled caption of this image."
+OCR_PROMPT = "Print all the extracted text from this image separated with a comma"
+
 #
-def download_file(url, path):
-    if not os.path.exists(os.path.dirname(path)):
-        try:
-            os.makedirs(os.path.dirname(path))
-        except Exception as e:
-            print(f"Error: {e}")
+class ArtifactStore:
+    """
+    Content-addressed store for downloaded videos and derived artifacts (audio, transcripts, documents).
 
-    try:
-        response = requests.get(url, stream=True)
-        with open(path, "wb") as file:
-            for chunk in response.iter_content(chunk_size=128):
+    Downloads are keyed by the SHA-256 of their content, and derived artifacts by the key of
+    their source plus the parameters that produced them (see `derived_key`), so two different
+    videos with the same file name never collide. Each artifact lives in its own
+    `objects/<key>/` directory under its original file name, and is published atomically by
+    renaming a fully written staging directory.
+
+    Artifacts should be produced in a directory from `staging_dir`, so that concurrent sessions
+    never write to the same path before `put_file` moves their results into the store.
+
+    An index of sizes and last access times is kept in `index.json`. When the total size
+    exceeds the quota, the least recently used artifacts are evicted, except those accessed
+    within the last `grace_secs` seconds, which may still be in use by a running session, and
+    those pinned with `pin` for the duration of a longer run.
+
+    Every read-modify-write of the index and every publication holds `_locked`, which combines
+    a thread lock with an exclusive `flock` on `index.lock`, since the Streamlit sessions and the
+    bulk runs sharing a store are separate processes.
+    """
+
+    _lock = threading.RLock()
+
+    def __init__(self, root=ARTIFACTS_DIR, quota_mb=ARTIFACTS_QUOTA_MB, grace_secs=3600, staging_max_age_secs=3 * 24 * 3600):
+        self.root = root
+        self.quota_bytes = quota_mb * 1024 * 1024
+        self.grace_secs = grace_secs
+        self.staging_max_age_secs = staging_max_age_secs
+        self.objects_dir = os.path.join(root, "objects")
+        self.staging_root = os.path.join(root, "tmp")
+        self.index_file = os.path.join(root, "index.json")
+        self.lock_file = os.path.join(root, "index.lock")
+        self._lock_fd = None
+        self._lock_depth = 0
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.staging_root, exist_ok=True)
+        self._clean_staging()
+
+    @staticmethod
+    def derived_key(kind, source_key, **params):
+        """
+        Returns the key of an artifact derived from another one.
+
+        Args:
+            kind (str): Kind of artifact, e.g. "audio" or "docx".
+            source_key (str): Key of the artifact it is produced from.
+            **params: Parameters that change the produced artifact.
+
+        Returns:
+            str: The SHA-256 hex digest identifying the artifact.
+        """
+        payload = json.dumps({"kind": kind, "source": source_key, "params": params}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @contextmanager
+    def _locked(self):
+        """Holds the store lock, across threads and processes. Re-entrant within a thread."""
+        with self._lock:
+            if self._lock_depth == 0 and fcntl is not None:
+                self._lock_fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+                fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0 and self._lock_fd is not None:
+                    fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+                    os.close(self._lock_fd)
+                    self._lock_fd = None
+
+    def _load_index(self):
+        if not os.path.isfile(self.index_file):
+            return {"objects": {}, "urls": {}}
+        with open(self.index_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_index(self, index):
+        tmp_file = f"{self.index_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(index, f)
+        os.replace(tmp_file, self.index_file)
+
+    def _object_path(self, key, entry):
+        return os.path.join(self.objects_dir, key, entry["name"])
+
+    def staging_dir(self):
+        """
+        Returns a new empty directory on the same file system as the store, to produce artifacts in.
+
+        The caller removes it when done. Directories left by an interrupted run are removed when
+        a store is opened, once they are older than `staging_max_age_secs`, which must exceed the
+        longest run (a bulk run waits for up to two 24 h batch windows).
+        """
+        return tempfile.mkdtemp(dir=self.staging_root)
+
+    def _clean_staging(self):
+        now = time.time()
+        for name in os.listdir(self.staging_root):
+            path = os.path.join(self.staging_root, name)
+            try:
+                if now - os.path.getmtime(path) > self.staging_max_age_secs:
+                    shutil.rmtree(path, ignore_errors=True)
+            except OSError:
+                pass
+
+    def get(self, key):
+        """
+        Looks an artifact up and marks it as recently used.
+
+        Args:
+            key (str): Key of the artifact.
+
+        Returns:
+            str: Path to the artifact, or None if it is not in the store.
+        """
+        with self._locked():
+            index = self._load_index()
+            entry = index["objects"].get(key)
+            if entry is None:
+                return None
+
+            path = self._object_path(key, entry)
+            if not os.path.isfile(path):
+                del index["objects"][key]
+                self._save_index(index)
+                return None
+
+            entry["last_access"] = time.time()
+            self._save_index(index)
+            return path
+
+    def pin(self, key):
+        """
+        Protects an artifact from eviction until `unpin` is called as many times.
+
+        Args:
+            key (str): Key of the artifact.
+        """
+        with self._locked():
+            index = self._load_index()
+            entry = index["objects"][key]
+            entry["pins"] = entry.get("pins", 0) + 1
+            self._save_index(index)
+
+    def unpin(self, key):
+        """
+        Releases a pin taken with `pin`.
+
+        Args:
+            key (str): Key of the artifact.
+        """
+        with self._locked():
+            index = self._load_index()
+            entry = index["objects"].get(key)
+            if entry is not None and entry.get("pins", 0) > 0:
+                entry["pins"] -= 1
+                self._save_index(index)
+
+    def put_file(self, key, src_path, kind=None):
+        """
+        Moves a file into the store under the given key, replacing any previous artifact with that key.
+
+        Args:
+            key (str): Key of the artifact.
+            src_path (str): Path of the produced file. It is moved, not copied.
+            kind (str, optional): Kind of artifact, recorded in the index.
+
+        Returns:
+            str: Path to the artifact in the store.
+        """
+        name = os.path.basename(src_path)
+        staging_dir = self.staging_dir()
+        shutil.move(src_path, os.path.join(staging_dir, name))
+        return self._publish(key, staging_dir, name, kind)
+
+    def _publish(self, key, staging_dir, name, kind):
+        size = os.path.getsize(os.path.join(staging_dir, name))
+        object_dir = os.path.join(self.objects_dir, key)
+
+        with self._locked():
+            if os.path.isdir(object_dir):
+                shutil.rmtree(object_dir)
+            os.replace(staging_dir, object_dir)
+
+            index = self._load_index()
+            index["objects"][key] = {
+                "name": name,
+                "kind": kind,
+                "size": size,
+                "last_access": time.time(),
+                "pins": index["objects"].get(key, {}).get("pins", 0),
+            }
+            self._evict(index, keep=key)
+            self._save_index(index)
+
+        return os.path.join(object_dir, name)
+
+    def fetch_url(self, url, name=None):
+        """
+        Downloads a file into the store, unless the cached copy is still current.
+
+        The server is asked with a conditional request (ETag / Last-Modified) whether the cached
+        copy changed, so a changed remote file is downloaded again. The download is hashed while
+        it is streamed to disk and stored under its content hash.
+
+        Args:
+            url (str): URL of the file.
+            name (str, optional): File name of the artifact. Defaults to the basename of the URL path.
+
+        Returns:
+            tuple: (key, path, downloaded) where `downloaded` is False when the cached copy was used.
+        """
+        if name is None:
+            name = os.path.basename(urlparse(url).path) or "download"
+
+        with self._locked():
+            cached = self._load_index()["urls"].get(url)
+
+        headers = {}
+        if cached and self.get(cached["key"]) is not None:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+        else:
+            cached = None
+
+        response = requests.get(url, stream=True, headers=headers, timeout=60)
+        if cached and response.status_code == 304:
+            response.close()
+            return cached["key"], self.get(cached["key"]), False
+        response.raise_for_status()
+
+        staging_dir = self.staging_dir()
+        digest = hashlib.sha256()
+        with open(os.path.join(staging_dir, name), "wb") as file:
+            for chunk in response.iter_content(chunk_size=1024 * 1024):
+                digest.update(chunk)
                 file.write(chunk)
-    except Exception as e:
-        print(f"Error: {e}")
+        key = digest.hexdigest()
+
+        path = self.get(key)
+        if path is None:
+            path = self._publish(key, staging_dir, name, "download")
+        else:
+            shutil.rmtree(staging_dir)
+
+        with self._locked():
+            index = self._load_index()
+            index["urls"][url] = {
+                "key": key,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            }
+            self._save_index(index)
+
+        return key, path, True
+
+    def _evict(self, index, keep=None):
+        """Removes the least recently used artifacts until the store fits in its quota."""
+        total = sum(entry["size"] for entry in index["objects"].values())
+        if total <= self.quota_bytes:
+            return
+
+        now = time.time()
+        for key, entry in sorted(index["objects"].items(), key=lambda item: item[1]["last_access"]):
+            if total <= self.quota_bytes:
+                break
+            if key == keep or entry.get("pins") or now - entry["last_access"] < self.grace_secs:
+                continue
+            print(f"Evicting artifact {key} ({entry['name']}, {entry['size'] / (1024 * 1024):.2f} MB)")
+            shutil.rmtree(os.path.join(self.objects_dir, key), ignore_errors=True)
+            del index["objects"][key]
+            total -= entry["size"]
+
+        index["urls"] = {
+            url: cached for url, cached in index["urls"].items() if cached["key"] in index["objects"]
+        }
 
 #
 def get_audio_file(video_file, RESULTS_DIR):
@@ -131,7 +489,276 @@ def get_audio_file(video_file, RESULTS_DIR):
     return audio_file
 
 #
-def azure_text_to_speech(audio_filepath, locale, disp=False):
+class WordStore:
+    """
+    Compact columnar store for the word-level results of Azure Speech-to-Text.
+
+    Words are interned once in a vocabulary and referenced by an int32 code, while offsets
+    and durations are kept as int64 100 ns ticks exactly as reported by the service. Each
+    column is a contiguous numpy array that grows geometrically, so batches coming from the
+    recognizer callbacks are appended without holding one dict per word.
+
+    The `_in_secs` columns are never stored; they are computed on demand from the ticks.
+    """
+
+    COLUMNS = ["Word", "Offset", "Duration", "Confidence"]
+
+    def __init__(self, capacity=1024):
+        self._vocab = []
+        self._vocab_index = {}
+        self._size = 0
+        self._codes = np.empty(capacity, dtype=np.int32)
+        self._offsets = np.empty(capacity, dtype=np.int64)
+        self._durations = np.empty(capacity, dtype=np.int64)
+        self._confidences = np.empty(capacity, dtype=np.float64)
+
+    def __len__(self):
+        return self._size
+
+    def _intern(self, word):
+        code = self._vocab_index.get(word)
+        if code is None:
+            code = len(self._vocab)
+            self._vocab_index[word] = code
+            self._vocab.append(word)
+        return code
+
+    def _reserve(self, size):
+        capacity = len(self._codes)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        for name in ("_codes", "_offsets", "_durations", "_confidences"):
+            column = getattr(self, name)
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            setattr(self, name, grown)
+
+    def append_batch(self, words):
+        """
+        Appends a batch of words as returned in the "Words" list of an Azure Speech result.
+
+        Args:
+            words (list of dict): Words with the keys 'Word', 'Offset', 'Duration' and,
+                                  optionally, 'Confidence'.
+        """
+        count = len(words)
+        if count == 0:
+            return
+        self._reserve(self._size + count)
+        end = self._size + count
+        self._codes[self._size:end] = [self._intern(item["Word"]) for item in words]
+        self._offsets[self._size:end] = [item["Offset"] for item in words]
+        self._durations[self._size:end] = [item["Duration"] for item in words]
+        self._confidences[self._size:end] = [item.get("Confidence", np.nan) for item in words]
+        self._size = end
+
+    @property
+    def words(self):
+        """numpy array of the words as strings."""
+        return np.asarray(self._vocab, dtype=object)[self.codes]
+
+    @property
+    def codes(self):
+        """int32 vocabulary code of each word."""
+        return self._codes[:self._size]
+
+    @property
+    def offsets(self):
+        """int64 offset of each word in 100 ns ticks."""
+        return self._offsets[:self._size]
+
+    @property
+    def durations(self):
+        """int64 duration of each word in 100 ns ticks."""
+        return self._durations[:self._size]
+
+    @property
+    def confidences(self):
+        """float64 confidence score of each word."""
+        return self._confidences[:self._size]
+
+    @property
+    def offsets_in_secs(self):
+        """Offset of each word in seconds, computed on demand."""
+        return self.offsets / TICKS_PER_SECOND
+
+    @property
+    def durations_in_secs(self):
+        """Duration of each word in seconds, computed on demand."""
+        return self.durations / TICKS_PER_SECOND
+
+    @classmethod
+    def read_csv(cls, csv_file):
+        """
+        Loads a store from a transcript file written with `to_dataframe().to_csv()`.
+
+        Args:
+            csv_file (str): Path to the transcript file.
+
+        Returns:
+            WordStore: The words of the transcript.
+        """
+        # Words such as "null" or "nan" must stay words, only a missing confidence is NaN
+        df = pd.read_csv(csv_file, index_col=0, dtype={"Word": str}, keep_default_na=False,
+                         na_values={"Confidence": [""]})
+        codes, vocab = pd.factorize(df["Word"])
+
+        store = cls(capacity=max(len(df), 1))
+        store._vocab = list(vocab)
+        store._vocab_index = {word: code for code, word in enumerate(store._vocab)}
+        store._size = len(df)
+        store._codes[:store._size] = codes
+        store._offsets[:store._size] = df["Offset"].to_numpy(dtype=np.int64)
+        store._durations[:store._size] = df["Duration"].to_numpy(dtype=np.int64)
+        store._confidences[:store._size] = df["Confidence"].to_numpy(dtype=np.float64)
+        return store
+
+    def record(self, index):
+        """Returns the word at `index` as a dict, in the format of the Azure Speech result."""
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("word index out of range")
+        return {
+            "Word": self._vocab[self._codes[index]],
+            "Offset": int(self._offsets[index]),
+            "Duration": int(self._durations[index]),
+            "Confidence": float(self._confidences[index]),
+        }
+
+    def as_list(self):
+        """Returns a read-only list-of-dicts view over the stored words."""
+        return WordListView(self)
+
+    def to_dataframe(self, in_secs=True):
+        """
+        Converts the store to a pandas DataFrame without copying the numeric columns.
+
+        The "Word" column is a categorical built from the interned vocabulary and codes.
+
+        Args:
+            in_secs (bool, optional): If True, adds the "Offset_in_secs" and "Duration_in_secs"
+                                      columns. Defaults to True.
+
+        Returns:
+            pandas.DataFrame: One row per word.
+        """
+        columns = {
+            "Word": pd.Categorical.from_codes(self.codes, categories=pd.Index(self._vocab, dtype=object)),
+            "Offset": self.offsets,
+            "Duration": self.durations,
+            "Confidence": self.confidences,
+        }
+        if in_secs:
+            columns["Offset_in_secs"] = self.offsets_in_secs
+            columns["Duration_in_secs"] = self.durations_in_secs
+        return pd.DataFrame(columns, copy=False)
+
+#
+class WordListView(Sequence):
+    """
+    Read-only view of a WordStore behaving like the former list of word dicts.
+
+    Items are materialized as dicts only when accessed.
+    """
+
+    def __init__(self, store):
+        self.store = store
+
+    def __len__(self):
+        return len(self.store)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.store.record(i) for i in range(*index.indices(len(self.store)))]
+        return self.store.record(index)
+
+    def __repr__(self):
+        return f"WordListView({len(self.store)} words)"
+
+#
+class WordTimeline:
+    """
+    Time index over the words of a transcription.
+
+    Offsets are kept as a sorted int64 array of 100 ns ticks, so the words spoken in any time
+    span are found with two binary searches and the transcript of a span is exact.
+    """
+
+    def __init__(self, words):
+        """
+        Args:
+            words (WordStore): The words of the transcription.
+        """
+        order = np.argsort(words.offsets, kind="stable")
+        self.offsets = words.offsets[order]
+        self.words = words.words[order]
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def text_between(self, start_secs, end_secs=None):
+        """
+        Returns the words starting in the [start_secs, end_secs) span, joined with spaces.
+
+        Args:
+            start_secs (float): Start of the span in seconds.
+            end_secs (float, optional): End of the span in seconds. Defaults to the end of the audio.
+
+        Returns:
+            str: The transcript of the span.
+        """
+        return self.text_between_ticks(
+            round(start_secs * TICKS_PER_SECOND),
+            None if end_secs is None else round(end_secs * TICKS_PER_SECOND))
+
+    def text_between_ticks(self, start_ticks, end_ticks=None):
+        """
+        Returns the words starting in the [start_ticks, end_ticks) span, joined with spaces.
+
+        Args:
+            start_ticks (int): Start of the span in 100 ns ticks.
+            end_ticks (int, optional): End of the span in 100 ns ticks. Defaults to the end of the audio.
+
+        Returns:
+            str: The transcript of the span.
+        """
+        start = np.searchsorted(self.offsets, start_ticks, side="left")
+        end = len(self.offsets) if end_ticks is None else np.searchsorted(self.offsets, end_ticks, side="left")
+        return " ".join(self.words[start:end])
+
+#
+def fill_step_transcripts(steps, timeline):
+    """
+    Fills the 'Audio Transcript' of each step from the word timeline.
+
+    The transcript of a step spans from its start to the next larger start among all the
+    steps, the last one running to the end of the audio, so steps listed out of order or
+    sharing an offset still get the words spoken after them. The start is the integer
+    'Offset' in 100 ns ticks when present, since 'Offset_in_secs' is rounded.
+
+    Args:
+        steps (list of dict): The steps of the SOP document, updated in place.
+        timeline (WordTimeline): The word timeline of the transcription.
+    """
+    starts = []
+    for step in steps:
+        offset = step.get('Offset')
+        if isinstance(offset, int) and not isinstance(offset, bool):
+            starts.append(offset)
+        else:
+            starts.append(round(step['Offset_in_secs'] * TICKS_PER_SECOND))
+
+    sorted_starts = sorted(starts)
+    for step, start in zip(steps, starts):
+        next_idx = bisect.bisect_right(sorted_starts, start)
+        end = sorted_starts[next_idx] if next_idx < len(sorted_starts) else None
+        step['Audio Transcript'] = timeline.text_between_ticks(start, end)
+
+#
+def azure_text_to_speech(audio_filepath, locale, disp=False, as_store=False):
     """
     Transcribes speech from an audio file using Azure Speech-to-Text (TTS) service.
 
@@ -148,12 +775,14 @@ def azure_text_to_speech(audio_filepath, locale, disp=False):
                   transcription.
     disp (bool, optional): If set to True, the function will print the transcription results, 
                             confidence scores, and word-level details. Defaults to False.
+    as_store (bool, optional): If set to True, the words are returned as a `WordStore` instead of
+                               a list-of-dicts view. Defaults to False.
 
     Returns:
-    tuple: A tuple containing three lists:
+    tuple: A tuple containing three elements:
         - transcript_display_list (list): List of transcriptions as displayed text.
         - confidence_list (list): List of confidence scores corresponding to the transcriptions.
-        - words (list): List of words with their details, including timing and confidence.
+        - words (WordListView or WordStore): Words with their details, including timing and confidence.
     """
 
     print(f"Running Speech to text from audio file {audio_filepath}\n")
@@ -188,7 +817,7 @@ def azure_text_to_speech(audio_filepath, locale, disp=False):
     transcript_display_list = []
     transcript_ITN_list = []
     confidence_list = []
-    words = []
+    words = WordStore()
 
     def parse_azure_result(evt):
         import json
@@ -204,7 +833,7 @@ def azure_text_to_speech(audio_filepath, locale, disp=False):
             response["NBest"][max_confidence_index]["Confidence"])
         transcript_ITN_list.append(
             response["NBest"][max_confidence_index]["ITN"])
-        words.extend(response["NBest"][max_confidence_index]["Words"])
+        words.append_batch(response["NBest"][max_confidence_index]["Words"])
 
     # Service callback that stops continuous recognition upon receiving an event `evt`
     def stop_cb(evt):
@@ -217,7 +846,7 @@ def azure_text_to_speech(audio_filepath, locale, disp=False):
             # Do something with the combined responses
             print(transcript_display_list)
             print(confidence_list)
-            print(words)
+            print(words.to_dataframe())
 
     # Connect callbacks to the events fired by the speech recognizer
     speech_recognizer.recognizing.connect(
@@ -244,7 +873,10 @@ def azure_text_to_speech(audio_filepath, locale, disp=False):
     print("Elapsed time: " + time.strftime(
         "%H:%M:%S.{}".format(str(elapsed % 1)[2:])[:15], time.gmtime(elapsed)))
 
-    return transcript_display_list, confidence_list, words
+    if as_store:
+        return transcript_display_list, confidence_list, words
+
+    return transcript_display_list, confidence_list, words.as_list()
 
 #
 def display_file_info(file_name):
@@ -280,7 +912,7 @@ def display_file_info(file_name):
     return file_name, file_size_mb, formatted_time
 
 #
-def ask_gpt4o(prompt, sop_text):
+def ask_gpt4o(prompt, sop_text, stream=False):
     """
     Sends a prompt to the GPT-4 model via Azure OpenAI and returns the response.
 
@@ -289,20 +921,34 @@ def ask_gpt4o(prompt, sop_text):
 
     Args:
         prompt (str): The input prompt to be sent to the GPT-4o model.
+        stream (bool, optional): If set to True, the completion is streamed and a generator of
+                                 text chunks is returned. Use `stream_steps` to get the steps
+                                 as soon as they are generated. Defaults to False.
 
     Returns:
-        str: The content of the response from the GPT-4o model.
+        str: The content of the response from the GPT-4o model, or a generator of its chunks
+             if `stream` is True.
     """
     model = AZURE_OPENAI_DEPLOYMENT_NAME
-    client = OPEANAI_CLIENT
+    client = _openai_client()
+
+    response = client.chat.completions.create(stream=stream, **_steps_request(prompt, sop_text, model))
+
+    if stream:
+        return _completion_chunks(response)
 
+    return response.choices[0].message.content
+
+#
+def _steps_request(prompt, sop_text, model):
+    """Returns the chat completion parameters of the step-structure request, shared with the batch mode."""
     # Response with the json object property
-    response = client.chat.completions.create(
-        model=model,
-        response_format={"type": "json_object"},
-        temperature=0.0,
-        max_tokens=2000,
-        messages=[
+    return {
+        "model": model,
+        "response_format": {"type": "json_object"},
+        "temperature": 0.0,
+        "max_tokens": 2000,
+        "messages": [
             {
                 "role":
                 "system",
@@ -315,18 +961,250 @@ def ask_gpt4o(prompt, sop_text):
                 "content": f"{prompt}: {sop_text}"
             },
         ],
-    )
+    }
 
-    return response.choices[0].message.content
+#
+def _completion_chunks(response):
+    """Yields the text content of a streamed chat completion."""
+    for chunk in response:
+        # Azure sends chunks without choices, e.g. for the prompt filter results
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+#
+class StepStreamParser:
+    """
+    Incremental JSON parser emitting the items of a top-level array as soon as they close.
+
+    The parser is fed with the chunks of a streamed completion such as
+    `{"Steps": [{...}, {...}]}` and returns each object of the `key` array once its
+    closing brace has been received, without waiting for the rest of the document.
+    The positions of the emitted items in the array are recorded in `emitted`.
+    """
+
+    def __init__(self, key="Steps"):
+        self.key = key
+        self.text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._last_key = None
+        self._array_depth = None
+        self._item_start = None
+        self._item_index = 0
+        self.emitted = set()
+
+    def feed(self, chunk):
+        """
+        Adds a chunk of text to the parser.
+
+        Args:
+            chunk (str): The next chunk of the JSON document.
+
+        Returns:
+            list of dict: The items of the array that have been completed by this chunk.
+        """
+        self.text += chunk
+        items = []
+
+        for pos in range(self._pos, len(self.text)):
+            char = self.text[pos]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_key = json.loads(self.text[self._string_start:pos + 1])
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = pos
+            elif char in "{[":
+                if char == "[" and self._depth == 1 and self._last_key == self.key and self._array_depth is None:
+                    self._array_depth = self._depth + 1
+                elif char == "{" and self._depth == self._array_depth:
+                    self._item_start = pos
+                self._depth += 1
+            elif char == "," and self._depth == self._array_depth:
+                self._item_index += 1
+            elif char in "}]":
+                self._depth -= 1
+                if char == "}" and self._depth == self._array_depth and self._item_start is not None:
+                    items.append(json.loads(self.text[self._item_start:pos + 1]))
+                    self.emitted.add(self._item_index)
+                    self._item_start = None
+                elif char == "]" and self._depth == 1 and self._array_depth is not None:
+                    self._array_depth = -1
+
+        self._pos = len(self.text)
+        return items
+
+#
+def stream_steps(chunks, key="Steps"):
+    """
+    Yields the steps of a streamed step-structure completion as soon as each one is complete.
+
+    Once the stream is over, the full completion is parsed to check that it is complete, and
+    any item of the array the incremental parser did not emit, e.g. one that is not an object,
+    is yielded, so the same steps are produced as by the non-streamed
+    `json.loads(completion)["Steps"]`. A completion truncated at `max_tokens` raises a
+    ValueError instead of silently producing a document with missing steps.
+
+    Args:
+        chunks (iterable of str): Text chunks, e.g. from `ask_gpt4o(..., stream=True)`.
+        key (str, optional): Name of the array holding the steps. Defaults to "Steps".
+
+    Yields:
+        dict: Each step object.
+    """
+    parser = StepStreamParser(key)
+    nb_steps = 0
+
+    for chunk in chunks:
+        for step in parser.feed(chunk):
+            nb_steps += 1
+            yield step
+
+    try:
+        completion = json.loads(parser.text)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Incomplete step structure after {nb_steps} steps, "
+                         f"the completion may have been truncated: {e}") from e
+
+    for idx, step in enumerate(completion[key]):
+        if idx not in parser.emitted:
+            yield step
+
+#
+def _probe_keyframes(video_file):
+    """
+    Lists the presentation timestamps of the video keyframes using ffmpeg.
+
+    Only keyframes are decoded (`-skip_frame nokey`), so this is much cheaper than a full pass.
+
+    Args:
+        video_file (str): Path to the video file.
+
+    Returns:
+        list of float: Sorted keyframe timestamps in seconds, or None if ffmpeg failed.
+    """
+    command = [
+        imageio_ffmpeg.get_ffmpeg_exe(),
+        "-hide_banner", "-nostats",
+        "-skip_frame", "nokey",
+        "-i", video_file,
+        "-map", "0:v:0",
+        "-vf", "showinfo",
+        "-f", "null", "-",
+    ]
+    try:
+        result = subprocess.run(command, capture_output=True, text=True, errors="replace", check=True)
+    except (OSError, RuntimeError, subprocess.CalledProcessError) as e:
+        print(f"Error: Cannot list keyframes of {video_file}: {e}")
+        return None
+
+    keyframes = [float(value) for value in re.findall(r"pts_time:\s*([-\d.]+)", result.stderr)]
+    return sorted(set(keyframes))
+
+#
+def get_media_index(video_file, index_dir=MEDIA_INDEX_DIR):
+    """
+    Returns the media index of a video file, building it on first use.
+
+    The index holds the container metadata (resolution, codec, frame count), the fps, the
+    duration and the keyframe timestamp table. It is cached in memory and on disk as a JSON
+    file keyed by the absolute path, size and modification time of the video, so a changed
+    file is re-indexed automatically.
+
+    Args:
+        video_file (str): Path to the video file.
+        index_dir (str, optional): Directory where the index files are cached.
+                                   Defaults to `MEDIA_INDEX_DIR`.
+
+    Returns:
+        dict: The media index, or None if the video cannot be opened.
+    """
+    stat = os.stat(video_file)
+    key = hashlib.sha256(
+        f"{os.path.abspath(video_file)}|{stat.st_size}|{stat.st_mtime_ns}|{MEDIA_INDEX_VERSION}".encode("utf-8")
+    ).hexdigest()
+
+    if key in _MEDIA_INDEX_CACHE:
+        return _MEDIA_INDEX_CACHE[key]
+
+    # After a failed keyframe probe, the index without keyframes is reused until the retry delay
+    failure = _MEDIA_INDEX_FAILURES.get(key)
+    if failure is not None and time.time() < failure[0]:
+        return failure[1]
+
+    index_file = os.path.join(index_dir, f"{key}.json")
+    if os.path.isfile(index_file):
+        with open(index_file, "r", encoding="utf-8") as f:
+            media_index = json.load(f)
+        _MEDIA_INDEX_CACHE[key] = media_index
+        return media_index
+
+    print(f"Building media index for {video_file}")
+    cap = cv2.VideoCapture(video_file) # pylint: disable=no-member
+    if not cap.isOpened():
+        print(f"Error: Cannot open video file {video_file}")
+        return None
+
+    fourcc = int(cap.get(cv2.CAP_PROP_FOURCC)) # pylint: disable=no-member
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) # pylint: disable=no-member
+    fps = cap.get(cv2.CAP_PROP_FPS) # pylint: disable=no-member
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)) # pylint: disable=no-member
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) # pylint: disable=no-member
+    cap.release()
+
+    keyframes = _probe_keyframes(video_file)
+
+    media_index = {
+        "version": MEDIA_INDEX_VERSION,
+        "path": os.path.abspath(video_file),
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+        "codec": "".join(chr((fourcc >> 8 * i) & 0xFF) for i in range(4)).strip("\x00"),
+        "width": width,
+        "height": height,
+        "total_frames": total_frames,
+        "fps": fps,
+        "duration": total_frames / fps if fps else 0.0,
+        "keyframes": keyframes or [],
+    }
+
+    # A failed keyframe probe may be transient, so that index is not persisted, only remembered
+    # for MEDIA_INDEX_RETRY_SECS so that frames fall back to CAP_PROP_POS_FRAMES without probing again
+    if keyframes is None:
+        _MEDIA_INDEX_FAILURES[key] = (time.time() + MEDIA_INDEX_RETRY_SECS, media_index)
+        return media_index
+    _MEDIA_INDEX_FAILURES.pop(key, None)
+
+    # Atomic write so that a concurrent reader never sees a partial index
+    os.makedirs(index_dir, exist_ok=True)
+    fd, tmp_file = tempfile.mkstemp(dir=index_dir, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(media_index, f)
+    os.replace(tmp_file, index_file)
+
+    _MEDIA_INDEX_CACHE[key] = media_index
+    return media_index
 
 #
 def get_video_info(video_file):
     """
     Prints the length, number of frames, and frames per second (FPS) of a video file.
 
-    This function opens a video file using OpenCV, retrieves information about the total number of frames,
-    frames per second (FPS), and calculates the duration of the video in hours, minutes, and seconds. It then
-    prints this information.
+    This function retrieves the total number of frames and frames per second (FPS) from the
+    media index of the video file, and calculates the duration of the video in hours, minutes,
+    and seconds. It then prints this information.
 
     Parameters:
     video_file (str): Path to the video file.
@@ -335,20 +1213,15 @@ def get_video_info(video_file):
     duration, total of frames and fps
     """
 
-    # Open the video file
-    cap = cv2.VideoCapture(video_file) # pylint: disable=no-member
     print(f"Video file: {video_file}")
+    media_index = get_media_index(video_file)
 
-    if not cap.isOpened():
-        print(f"Error: Cannot open video file {video_file}")
+    if media_index is None:
         return
 
-    # Get the total number of frames
-    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) # pylint: disable=no-member
-    # Get the frames per second (FPS)
-    fps = cap.get(cv2.CAP_PROP_FPS) # pylint: disable=no-member
-    # Calculate the duration of the video in seconds
-    duration = total_frames / fps
+    total_frames = media_index["total_frames"]
+    fps = media_index["fps"]
+    duration = media_index["duration"]
     # Convert duration to hours, minutes, and seconds
     hours = int(duration // 3600)
     minutes = int((duration % 3600) // 60)
@@ -360,9 +1233,6 @@ def get_video_info(video_file):
     print(f"- Number of frames: {total_frames}")
     print(f"- Frames per second (FPS): {fps:.0f}")
 
-    # Release the video capture object
-    cap.release()
-
     return duration, total_frames, fps
 
 #
@@ -370,6 +1240,10 @@ def get_video_frame(video_file, offset_in_secs, FRAMES_DIR):
     """
     Extracts a frame from a video file at a specified offset in seconds and saves it as an image file.
 
+    The media index is used to seek to the nearest keyframe preceding the offset, then frames
+    are decoded forward up to the offset. The cost is therefore bounded by one group of pictures
+    and the returned frame is exact, whatever the length of the video.
+
     Args:
         video_file (str): Path to the video file.
         offset_in_secs (float): The offset in seconds from which to capture the frame.
@@ -378,6 +1252,11 @@ def get_video_frame(video_file, offset_in_secs, FRAMES_DIR):
         str: Path to the saved frame image file.
     """
 
+    media_index = get_media_index(video_file)
+    if media_index is None:
+        print("Error: Could not open video.")
+        return
+
     # Open the video file
     cap = cv2.VideoCapture(video_file) # pylint: disable=no-member
 
@@ -386,20 +1265,29 @@ def get_video_frame(video_file, offset_in_secs, FRAMES_DIR):
         print("Error: Could not open video.")
         return
 
-    # Get the frames per second (fps) of the video
-    fps = cap.get(cv2.CAP_PROP_FPS) # pylint: disable=no-member
-
-    # Calculate the frame number to capture
-    frame_number = int(offset_in_secs * fps)
-
-    # Set the video to start at the calculated frame
-    cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number) # pylint: disable=no-member
-
-    # Read the frame
-    ret, frame = cap.read()
+    fps = media_index["fps"]
+    keyframes = media_index["keyframes"]
+
+    if keyframes:
+        # Seek to the nearest preceding keyframe, then decode forward to the requested offset
+        position = bisect.bisect_right(keyframes, offset_in_secs) - 1
+        keyframe_secs = keyframes[max(position, 0)]
+        cap.set(cv2.CAP_PROP_POS_MSEC, keyframe_secs * 1000) # pylint: disable=no-member
+
+        target_msec = offset_in_secs * 1000 - 500 / fps
+        ret = cap.grab()
+        while ret and cap.get(cv2.CAP_PROP_POS_MSEC) < target_msec: # pylint: disable=no-member
+            ret = cap.grab()
+        if ret:
+            ret, frame = cap.retrieve()
+    else:
+        # No keyframe table available, let OpenCV seek by frame number
+        cap.set(cv2.CAP_PROP_POS_FRAMES, int(offset_in_secs * fps)) # pylint: disable=no-member
+        ret, frame = cap.read()
 
     if not ret:
         print("Error: Could not read frame.")
+        cap.release()
         return
 
     # Save the frame as an image
@@ -462,11 +1350,18 @@ def gpt4o_imagefile(image_file, prompt, model):
         dict: The response from Azure OpenAI's GPT-4 model containing the analysis results.
     """
 
-    client = OPEANAI_CLIENT
+    client = _openai_client()
+
+    response = client.chat.completions.create(**_image_request(image_file, prompt, model))
 
-    response = client.chat.completions.create(
-        model=model,
-        messages=[
+    return response
+
+#
+def _image_request(image_file, prompt, model):
+    """Returns the chat completion parameters of an image analysis request, shared with the batch mode."""
+    return {
+        "model": model,
+        "messages": [
             {
                 "role": "system",
                 "content": "You are an AI helpful assistant to analyse images.",
@@ -482,41 +1377,62 @@ def gpt4o_imagefile(image_file, prompt, model):
                 ],
             },
         ],
-        max_tokens=2000,
-        temperature=0.0,
-    )
-
-    return response
+        "max_tokens": 2000,
+        "temperature": 0.0,
+    }
 
 #
-def checklist_docx_file(video_file, json_data, RESULTS_DIR, nb_images_per_step=3):
+def analyse_step_frames(video_file, offset_secs, FRAMES_DIR, nb_images_per_step, model):
     """
-    Generates a DOCX file containing a checklist based on video frames and provided JSON data.
-
-    This function creates a Word document with a checklist where each checklist step includes
-    a heading, summary, keywords, and images extracted from a video file at specified offsets.
+    Extracts the frames of a checklist step and generates their caption and OCR with GPT-4o.
 
     Args:
         video_file (str): Path to the video file from which frames are extracted.
-        json_data (list of dict): List of dictionaries where each dictionary represents a checklist step
-                                  containing keys like 'Step', 'Summary', 'Keywords', 'Offset', and 'Offset_in_secs'.
-        nb_images_per_step (int, optional): Number of images to include for each checklist step. Defaults to 3.
+        offset_secs (float): Offset in seconds of the step.
+        FRAMES_DIR (str): Directory where the frames are saved. It must be specific to the step,
+                          since frames are named after the video file and their offset only.
+        nb_images_per_step (int): Number of frames to extract for the step.
+        model (str): Azure OpenAI deployment used for the vision calls.
 
     Returns:
-        str: Path to the generated DOCX file.
+        list of dict: One dictionary per frame with the keys 'frame_file', 'caption' and 'ocr'.
     """
-    model = AZURE_OPENAI_DEPLOYMENT_NAME
+    frames = []
+    os.makedirs(FRAMES_DIR, exist_ok=True)
 
-    print("Generating checklist file...")
+    for img_idx in range(1, nb_images_per_step + 1):
+        # Retrieve the frame
+        frame_file = get_video_frame(
+            video_file,
+            int(offset_secs) + img_idx * 3,
+            FRAMES_DIR)
+        if frame_file is None:
+            continue
 
-    image_size = 5 # size of each image that will be inserted
+        # Automatic caption of the frame
+        caption_image = gpt4o_imagefile(frame_file, CAPTION_PROMPT, model)
+        caption = caption_image.choices[0].message.content
 
-    FRAMES_DIR = f"{RESULTS_DIR}/frames"
+        # OCR of the frame
+        ocr_image = gpt4o_imagefile(frame_file, OCR_PROMPT, model)
+        ocr = ocr_image.choices[0].message.content
 
-    # Filename
-    docx_file = os.path.join(
-        RESULTS_DIR,
-        os.path.splitext(os.path.basename(video_file))[0] + ".docx")
+        frames.append({"frame_file": frame_file, "caption": caption, "ocr": ocr})
+
+    return frames
+
+#
+def write_checklist_docx(video_file, steps, docx_file):
+    """
+    Writes the checklist Word document from the steps and the analysis of their frames.
+
+    Args:
+        video_file (str): Path to the video file the checklist is generated from.
+        steps (iterable of tuple): (step, frames) pairs in document order, where `frames` is the
+                                   list returned by `analyse_step_frames`.
+        docx_file (str): Path of the DOCX file to write.
+    """
+    image_size = 5 # size of each image that will be inserted
 
     # Initialize the document
     doc = Document()
@@ -535,12 +1451,12 @@ def checklist_docx_file(video_file, json_data, RESULTS_DIR, nb_images_per_step=3
     duration = 0  # do not change
 
     # Process each step from the JSON data
-    for idx, step in enumerate(json_data, start=1):
+    for idx, (step, frames) in enumerate(steps, start=1):
         # get values
         title = str(step['Title']).upper()
         summary = step['Summary']
         keywords = step['Keywords']
-        audio_transcript = step['Audio Transcript']
+        audio_transcript = step.get('Audio Transcript', '')
         offset_secs = step['Offset_in_secs']
         duration = round(step['Offset_in_secs'] - duration, 3)
 
@@ -554,27 +1470,18 @@ def checklist_docx_file(video_file, json_data, RESULTS_DIR, nb_images_per_step=3
         doc.add_paragraph(f"Duration in seconds: {duration}")
 
         # Add images & automatic caption for the current step
-        for img_idx in range(1, nb_images_per_step + 1):
-            # Retrieve the frame and add it to the document
-            frame_file = get_video_frame(
-                video_file,
-                int(offset_secs) + img_idx * 3,
-                FRAMES_DIR)            
-            doc.add_picture(frame_file, width=Inches(image_size))
+        # A caption or OCR request that failed is None
+        for frame in frames:
+            doc.add_picture(frame["frame_file"], width=Inches(image_size))
 
             # Adding the automatic caption of the frame
-            caption_image = gpt4o_imagefile(frame_file, "Generate a detailled caption of this image.", model)
-            caption = caption_image.choices[0].message.content
+            caption = frame['caption'] if frame['caption'] is not None else "(not available)"
             doc.add_paragraph(f"- Automatic frame caption: {caption}")
 
             # OCR of the frame
-            ocr_image = gpt4o_imagefile(frame_file, "Print all the extracted text from this image separated with a comma", model)
-            ocr = ocr_image.choices[0].message.content
+            ocr = frame['ocr'] if frame['ocr'] is not None else "(not available)"
             doc.add_paragraph(f"- Automatic OCR: {ocr}")
 
-            # Deleting the frame file (optional)
-            os.remove(frame_file)
-
         # Add a blank line for spacing
         doc.add_page_break()
 
@@ -588,7 +1495,188 @@ def checklist_docx_file(video_file, json_data, RESULTS_DIR, nb_images_per_step=3
     # Save the document
     doc.save(docx_file)
 
+#
+def checklist_docx_file(video_file, json_data, RESULTS_DIR, nb_images_per_step=3, max_workers=4, timeline=None):
+    """
+    Generates a DOCX file containing a checklist based on video frames and provided JSON data.
+
+    This function creates a Word document with a checklist where each checklist step includes
+    a heading, summary, keywords, and images extracted from a video file at specified offsets.
+
+    The frames of each step are analysed in a thread pool as soon as the step is received, so
+    `json_data` can be a generator such as `stream_steps` and the vision calls of the first
+    steps run while the next steps are still being generated.
+
+    Args:
+        video_file (str): Path to the video file from which frames are extracted.
+        json_data (iterable of dict): Dictionaries where each dictionary represents a checklist step
+                                  containing keys like 'Step', 'Summary', 'Keywords', 'Offset', and 'Offset_in_secs'.
+        nb_images_per_step (int, optional): Number of images to include for each checklist step. Defaults to 3.
+        max_workers (int, optional): Number of steps analysed concurrently. Defaults to 4.
+        timeline (WordTimeline, optional): If set, the 'Audio Transcript' of each step is sliced
+                                           from it once all the steps are known. Defaults to None.
+
+    Returns:
+        str: Path to the generated DOCX file.
+    """
+    model = AZURE_OPENAI_DEPLOYMENT_NAME
+
+    print("Generating checklist file...")
+
+    # Frames of this run, one directory per step so that concurrent steps never share a frame file
+    FRAMES_DIR = tempfile.mkdtemp(dir=RESULTS_DIR, prefix="frames_")
+
+    # Filename
+    docx_file = os.path.join(
+        RESULTS_DIR,
+        os.path.splitext(os.path.basename(video_file))[0] + ".docx")
+
+    # Start the frame analysis of each step as soon as it is available
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        steps = [
+            (step, executor.submit(analyse_step_frames, video_file, step['Offset_in_secs'],
+                                   os.path.join(FRAMES_DIR, f"step_{idx}"), nb_images_per_step, model))
+            for idx, step in enumerate(json_data)
+        ]
+
+        # The transcript of a step ends where the next step starts, so it is filled in last
+        if timeline is not None:
+            fill_step_transcripts([step for step, _ in steps], timeline)
+
+        write_checklist_docx(
+            video_file,
+            ((step, frames.result()) for step, frames in steps),
+            docx_file)
+
+    # Deleting the frame files (optional)
+    shutil.rmtree(FRAMES_DIR)
+
     # End
     print(f"\nDone. Checklist file has been saved to {docx_file}")
 
     return docx_file
+
+#
+def _batch_client():
+    """Returns an Azure OpenAI client for the Batch API, which requires a recent API version."""
+    if os.getenv("AZURE_OPENAI_KEY"):
+        return AzureOpenAI(azure_endpoint=AZURE_OPENAI_BATCH_ENDPOINT,
+                           api_key=os.getenv("AZURE_OPENAI_KEY"),
+                           api_version="2024-10-21")
+    return AzureOpenAI(azure_endpoint=AZURE_OPENAI_BATCH_ENDPOINT,
+                       azure_ad_token_provider=get_bearer_token_provider(DefaultAzureCredential(),"https://cognitiveservices.azure.com/.default"),
+                       api_version="2024-10-21")
+
+#
+def batch_checklist_docx_files(videos, RESULTS_DIR, nb_images_per_step=3, client=None, poll_secs=BATCH_POLL_SECS):
+    """
+    Generates the checklist DOCX files of several videos through the Azure OpenAI Batch API.
+
+    This is the offline counterpart of `ask_gpt4o` followed by `checklist_docx_file`, meant for
+    bulk regeneration where throughput and cost matter more than latency. It runs two batches:
+    the step extraction of every video, then the caption and OCR of every frame of every step.
+    The requests are written to JSONL files as the frames are extracted, and the results are
+    mapped back to their steps and frames to assemble the documents.
+
+    The video files must stay available until this function returns, hours later, so videos
+    from the ArtifactStore should be pinned for the whole run.
+
+    Args:
+        videos (list of tuple): (video_file, words) pairs, where `words` is the `WordStore`
+                                returned by `azure_text_to_speech(..., as_store=True)`.
+        nb_images_per_step (int, optional): Number of images to include for each checklist step. Defaults to 3.
+        client (AzureOpenAI, optional): Client exposing the `files` and `batches` endpoints.
+                                        Defaults to a client for `AZURE_OPENAI_BATCH_ENDPOINT`.
+        poll_secs (int, optional): Delay between two status checks. Defaults to `BATCH_POLL_SECS`.
+
+    Returns:
+        list of str: Paths to the generated DOCX files, None for the videos whose steps failed.
+    """
+    model = AZURE_OPENAI_BATCH_DEPLOYMENT_NAME
+
+    if client is None:
+        client = _batch_client()
+
+    FRAMES_DIR = f"{RESULTS_DIR}/frames"
+    BATCH_DIR = f"{RESULTS_DIR}/batches"
+
+    # Step extraction of every video
+    print("Extracting the steps of every video...")
+    steps_batch = BatchWriter(BATCH_DIR)
+    for video_idx, (video_file, words) in enumerate(videos):
+        steps_batch.add(
+            f"steps|{video_idx}",
+            _steps_request(SOP_STEPS_PROMPT, words.to_dataframe().to_json(orient="records"), model))
+    steps_results = run_batch(steps_batch, client, poll_secs)
+
+    all_steps = []
+    for video_idx, (video_file, words) in enumerate(videos):
+        completion = steps_results[f"steps|{video_idx}"]
+        if completion is None:
+            all_steps.append(None)
+            continue
+        try:
+            steps = json.loads(completion)["Steps"]
+            fill_step_transcripts(steps, WordTimeline(words))
+        except (json.JSONDecodeError, KeyError, TypeError) as e:
+            print(f"Error: Invalid step structure for {video_file}: {e}")
+            all_steps.append(None)
+            continue
+        all_steps.append(steps)
+
+    # Caption and OCR of every frame of every step
+    print("Analysing the frames of every step...")
+    frame_files = {}
+    vision_batch = BatchWriter(BATCH_DIR)
+    for video_idx, (video_file, words) in enumerate(videos):
+        # Videos may share a file name, so their frames are kept apart
+        video_frames_dir = os.path.join(FRAMES_DIR, str(video_idx))
+        for step_idx, step in enumerate(all_steps[video_idx] or []):
+            step_frames_dir = os.path.join(video_frames_dir, f"step_{step_idx}")
+            os.makedirs(step_frames_dir, exist_ok=True)
+            for img_idx in range(1, nb_images_per_step + 1):
+                frame_id = f"{video_idx}|{step_idx}|{img_idx}"
+                frame_file = get_video_frame(
+                    video_file,
+                    int(step['Offset_in_secs']) + img_idx * 3,
+                    step_frames_dir)
+                if frame_file is None:
+                    continue
+                frame_files[frame_id] = frame_file
+                vision_batch.add(f"caption|{frame_id}", _image_request(frame_file, CAPTION_PROMPT, model))
+                vision_batch.add(f"ocr|{frame_id}", _image_request(frame_file, OCR_PROMPT, model))
+    vision_results = run_batch(vision_batch, client, poll_secs)
+
+    # Assemble the documents
+    docx_files = []
+    for video_idx, (video_file, words) in enumerate(videos):
+        if all_steps[video_idx] is None:
+            print(f"Error: No steps could be extracted for {video_file}")
+            docx_files.append(None)
+            continue
+
+        steps = []
+        for step_idx, step in enumerate(all_steps[video_idx]):
+            frames = []
+            for img_idx in range(1, nb_images_per_step + 1):
+                frame_id = f"{video_idx}|{step_idx}|{img_idx}"
+                if frame_id not in frame_files:
+                    continue
+                frames.append({
+                    "frame_file": frame_files[frame_id],
+                    "caption": vision_results[f"caption|{frame_id}"],
+                    "ocr": vision_results[f"ocr|{frame_id}"],
+                })
+            steps.append((step, frames))
+
+        docx_dir = os.path.join(BATCH_DIR, f"docx_{video_idx}")
+        os.makedirs(docx_dir, exist_ok=True)
+        docx_file = os.path.join(
+            docx_dir,
+            os.path.splitext(os.path.basename(video_file))[0] + ".docx")
+        write_checklist_docx(video_file, steps, docx_file)
+        shutil.rmtree(os.path.join(FRAMES_DIR, str(video_idx)), ignore_errors=True)
+        print(f"Checklist file has been saved to {docx_file}")
+        docx_files.append(docx_file)
+
+    return docx_files
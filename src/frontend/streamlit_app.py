@@ -3,23 +3,12 @@ Streamlit app for VANTAGE Genie Accelerator
 '''
 import os
 import time
-import json
-from urllib.parse import urlparse
+import shutil
 import streamlit as st
 import helpers
-import pandas as pd
 
 def main():
 
-    VIDEO_DIR = "../data"
-    os.makedirs(VIDEO_DIR, exist_ok=True)
-
-    RESULTS_DIR = "../results"
-    os.makedirs(RESULTS_DIR, exist_ok=True)
-
-    FRAMES_DIR = f"{RESULTS_DIR}/frames"
-    os.makedirs(FRAMES_DIR, exist_ok=True)
-
     # Language in the video for Azure Speech to Text
     language = "en-US"
 
@@ -28,7 +17,7 @@ def main():
 
     source_video_file = "https://raw.githubusercontent.com/retkowsky/samplesvideos/main/forklift_checklist.mp4"
     src_video_file = st.text_input("Process video file from:", source_video_file)
-    dst_video_folder = st.text_input("Save video file to:", VIDEO_DIR)
+    dst_artifacts_folder = st.text_input("Save video file and artifacts to:", helpers.ARTIFACTS_DIR)
 
     if st.button("Start processing"):
         st.divider()
@@ -38,139 +27,110 @@ def main():
             st.info(f"It seems you are trying to download file from YouTube. That is currently not supported. Please select different video file.")
             st.stop()
 
-        # Download video from direct link
+        # Download video from direct link, unless the local copy is still current
         else:
-            dst_video_file = os.path.join(dst_video_folder, os.path.basename(urlparse(src_video_file).path))
-            if not os.path.isfile(dst_video_file):
-                st.info(f"Downloading {src_video_file}")
+            store = helpers.ArtifactStore(dst_artifacts_folder)
+            st.info(f"Downloading {src_video_file}")
+            start = time.time()
+            video_key, dst_video_file, downloaded = store.fetch_url(src_video_file)
+            elapsed = time.time() - start
+            if downloaded:
+                st.info("Completed in " + time.strftime(
+                    "%H:%M:%S.{}".format(str(elapsed % 1)[2:])[:15], time.gmtime(elapsed)))
+            else:
+                st.info(f"Using local copy because {src_video_file} has not changed since it was downloaded")
+
+        # Audio, transcript, frames and document of this run are produced in their own directory,
+        # then moved into the artifact store, so that concurrent sessions never collide
+        RESULTS_DIR = store.staging_dir()
+
+        # The video and its audio are pinned, so that no other session evicts them while they are in use
+        pinned_keys = [video_key]
+        store.pin(video_key)
+        try:
+            video_file = open(dst_video_file, "rb")
+            video_bytes = video_file.read()
+            st.video(video_bytes)
+
+            # Display video file information
+            file_name, file_size_mb, formatted_time = helpers.display_file_info(video_file.name)
+            duration, total_frames, fps = helpers.get_video_info(video_file.name)
+            hours = int(duration // 3600)
+            minutes = int((duration % 3600) // 60)
+            seconds = int(duration % 60)
+            video_file_info = f"""
+            ### Video File Information \n
+            Source: <{src_video_file}>  \n
+            Destination: {file_name} \n
+            Size: {file_size_mb:.2f} MB \n
+            Last Modified: {formatted_time} \n
+            Duration: {duration:.0f} seconds \n
+            Length of video: {hours:02}:{minutes:02}:{seconds:02} \n
+            Number of frames: {total_frames} \n
+            Frames per second (FPS): {fps:.0f}
+            """
+            st.info(video_file_info)
+
+            # Extract audio from video file
+            st.divider()
+            audio_key = store.derived_key("audio", video_key, format="wav")
+            audio_file = store.get(audio_key)
+            if audio_file is None:
+                st.info("Extracting audio from video file")
                 start = time.time()
-                helpers.download_file(src_video_file, dst_video_file)
+                audio_file = store.put_file(audio_key, helpers.get_audio_file(video_file.name, RESULTS_DIR), "audio")
                 elapsed = time.time() - start
                 st.info("Completed in " + time.strftime(
                     "%H:%M:%S.{}".format(str(elapsed % 1)[2:])[:15], time.gmtime(elapsed)))
             else:
-                st.info(f"Using local copy because {src_video_file} has already been previously downloaded")
-
-        video_file = open(dst_video_file, "rb")
-        video_bytes = video_file.read()
-        st.video(video_bytes)
-
-        # Display video file information
-        file_name, file_size_mb, formatted_time = helpers.display_file_info(video_file.name)
-        duration, total_frames, fps = helpers.get_video_info(video_file.name)
-        hours = int(duration // 3600)
-        minutes = int((duration % 3600) // 60)
-        seconds = int(duration % 60)
-        video_file_info = f"""
-        ### Video File Information \n
-        Source: <{src_video_file}>  \n
-        Destination: {file_name} \n
-        Size: {file_size_mb:.2f} MB \n
-        Last Modified: {formatted_time} \n
-        Duration: {duration:.0f} seconds \n
-        Length of video: {hours:02}:{minutes:02}:{seconds:02} \n
-        Number of frames: {total_frames} \n
-        Frames per second (FPS): {fps:.0f}
-        """
-        st.info(video_file_info)
-
-        # Extract audio from video file
-        st.divider()
-        audio_file = os.path.join(
-            RESULTS_DIR,
-            os.path.splitext(os.path.basename(video_file.name))[0] + ".wav"
-            )
-        if not os.path.isfile(audio_file):
-            st.info("Extracting audio from video file")
+                st.info(f"Using local copy because {audio_file} has already been extracted")
+            store.pin(audio_key)
+            pinned_keys.append(audio_key)
+
+            # Transcribe audio file using Azure Speech to Text
+            st.divider()
+            transcript_key = store.derived_key("transcript", audio_key, locale=language)
+            transcript_file = store.get(transcript_key)
+            if transcript_file is None:
+                st.info("Transcribing audio file to text")
+                start = time.time()
+                transcript, confidence, words = helpers.azure_text_to_speech(audio_file, language, as_store=True)
+                elapsed = time.time() - start
+                st.info("Completed in " + time.strftime(
+                    "%H:%M:%S.{}".format(str(elapsed % 1)[2:])[:15], time.gmtime(elapsed)))
+                transcript_file = os.path.join(
+                    RESULTS_DIR,
+                    os.path.splitext(os.path.basename(video_file.name))[0] + ".txt"
+                    )
+                words.to_dataframe().to_csv(transcript_file)
+                store.put_file(transcript_key, transcript_file, "transcript")
+            else:
+                st.info(f"Using local copy because {audio_file} has already been transcribed")
+                words = helpers.WordStore.read_csv(transcript_file)
+            df = words.to_dataframe()
+
+            # Create SOP document structure using Azure AI
+            st.divider()
+            st.info("Creating SOP document structure")
+            sop_text = df.to_json(orient="records")
+
+            # Create SOP document in Microsoft Word format
+            # Steps are streamed so that the frames of each step are analysed as soon as it is generated
+            # The audio transcript of each step is sliced from the transcription words
+            st.info("Creating SOP document in Microsoft Word format")
             start = time.time()
-            audio_file = helpers.get_audio_file(video_file.name, RESULTS_DIR)
+            json_data = helpers.stream_steps(helpers.ask_gpt4o(helpers.SOP_STEPS_PROMPT, sop_text, stream=True))
+            docx_file = helpers.checklist_docx_file(
+                video_file.name, json_data, RESULTS_DIR, 1, timeline=helpers.WordTimeline(words))
+            docx_file = store.put_file(
+                store.derived_key("docx", video_key, locale=language, nb_images_per_step=1), docx_file, "docx")
             elapsed = time.time() - start
             st.info("Completed in " + time.strftime(
                 "%H:%M:%S.{}".format(str(elapsed % 1)[2:])[:15], time.gmtime(elapsed)))
-        else:
-            st.info(f"Using local copy because {audio_file} has already been extracted")
-
-        # Transcribe audio file using Azure Speech to Text
-        st.divider()
-        st.info("Transcribing audio file to text")
-        start = time.time()
-        transcript, confidence, words = helpers.azure_text_to_speech(audio_file, language)
-        elapsed = time.time() - start
-        st.info("Completed in " + time.strftime(
-            "%H:%M:%S.{}".format(str(elapsed % 1)[2:])[:15], time.gmtime(elapsed)))
-        df = pd.DataFrame(words, columns=["Word", "Offset", "Duration", "Confidence"])
-        df["Offset_in_secs"] = df["Offset"] / 10_000_000
-        df["Duration_in_secs"] = df["Duration"] / 10_000_000
-        transcript_file = os.path.join(
-            RESULTS_DIR,
-            os.path.splitext(os.path.basename(video_file.name))[0] + ".txt"
-            )
-        df.to_csv(transcript_file)
-
-        # Create SOP document structure using Azure AI
-        st.divider()
-        st.info("Creating SOP document structure")
-        sop_text = df.to_json(orient="records")
-        prompt = """
-        Describe the main steps of this checklist document.
-        Extract all the specific steps. Please be precise and concise.
-
-        ### Output must have following properties:
-        - Step: step number
-        - Title: Generate a simple summary of the step
-        - Summary: Generate a summary of the step in 2 or 3 lines
-        - Keywords: generate some keywords to explain the step
-        - Audio Transcript: Provide an audio transcript of the step
-        - Offset: offset
-        - Offset_in_secs: offset in seconds
-
-        ### Here is an example:
-        {
-            "Steps": [
-                {
-                    "Step": 1,
-                    "Title": "Introduction",
-                    "Summary": "Provide an overview of the checklist document, including its purpose and scope.",
-                    "Keywords": [
-                        "overview",
-                        "purpose",
-                        "scope"
-                    ],
-                    "Audio Transcript": "Provide an audio transcript of this step.",
-                    "Offset": 5900000,
-                    "Offset_in_secs": 0.59
-                },
-                {
-                    "Step": 2,
-                    "Title": "Preparation",
-                    "Summary": "Outline the necessary preparations before starting the main tasks, such as gathering materials and setting up the environment.",
-                    "Keywords": [
-                        "preparation",
-                        "materials",
-                        "setup"
-                    ],
-                    "Audio Transcript": "Provide an audio transcript of this step.",
-                    "Offset": 183300000,
-                    "Offset_in_secs": 18.33
-                }
-            ]
-        }
-        """
-        start = time.time()
-        completion = helpers.ask_gpt4o(prompt, sop_text)
-        elapsed = time.time() - start
-        st.info("Completed in " + time.strftime(
-            "%H:%M:%S.{}".format(str(elapsed % 1)[2:])[:15], time.gmtime(elapsed)))
-
-        # Create SOP document in Microsoft Word format
-        st.divider()
-        st.info("Creating SOP document in Microsoft Word format")
-        json_data = json.loads(completion)["Steps"]
-        start = time.time()
-        docx_file = helpers.checklist_docx_file(video_file.name, json_data, RESULTS_DIR, 1)
-        elapsed = time.time() - start
-        st.info("Completed in " + time.strftime(
-            "%H:%M:%S.{}".format(str(elapsed % 1)[2:])[:15], time.gmtime(elapsed)))
+        finally:
+            for key in pinned_keys:
+                store.unpin(key)
+            shutil.rmtree(RESULTS_DIR, ignore_errors=True)
 
         # Download SOP document
         @st.fragment
@@ -0,0 +1,8 @@
+"""
+Makes the frontend modules importable when the tests are run with pytest from src/frontend.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
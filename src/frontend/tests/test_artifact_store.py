@@ -0,0 +1,78 @@
+"""
+Tests of the content-addressed artifact store.
+"""
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+import unittest
+
+from helpers import ArtifactStore
+
+
+def pin_many(root, key, count, barrier):
+    store = ArtifactStore(root)
+    barrier.wait()
+    for _ in range(count):
+        store.pin(key)
+
+
+class ArtifactStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.store = ArtifactStore(self.root)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def put(self, key, name="file.txt", content=b"content"):
+        src_file = os.path.join(self.store.staging_dir(), name)
+        with open(src_file, "wb") as f:
+            f.write(content)
+        return self.store.put_file(key, src_file, "test")
+
+    def test_put_and_get(self):
+        path = self.put("a", content=b"first")
+        self.assertEqual(self.store.get("a"), path)
+        self.put("a", content=b"second")
+        with open(self.store.get("a"), "rb") as f:
+            self.assertEqual(f.read(), b"second")
+        self.assertIsNone(self.store.get("b"))
+
+    def test_eviction_skips_pinned_and_recent_artifacts(self):
+        store = ArtifactStore(self.root, quota_mb=10 / (1024 * 1024), grace_secs=0)
+        self.put("old", content=b"12345678")
+        self.put("pinned", content=b"12345678")
+        store.pin("pinned")
+        src_file = os.path.join(store.staging_dir(), "new.txt")
+        with open(src_file, "wb") as f:
+            f.write(b"12345678")
+        store.put_file("new", src_file)
+        self.assertIsNone(store.get("old"))
+        self.assertIsNotNone(store.get("pinned"))
+        self.assertIsNotNone(store.get("new"))
+
+    def test_pins_from_concurrent_processes_are_not_lost(self):
+        self.put("a")
+        context = multiprocessing.get_context("spawn")
+        barrier = context.Barrier(4)
+        processes = [context.Process(target=pin_many, args=(self.root, "a", 100, barrier)) for _ in range(3)]
+        for process in processes:
+            process.start()
+        barrier.wait(timeout=120)
+        for process in processes:
+            process.join()
+        self.assertEqual(self.store._load_index()["objects"]["a"]["pins"], 300)
+
+    def test_lock_is_reentrant(self):
+        with self.store._locked():
+            with self.store._locked():
+                self.put("a")
+            self.assertIsNotNone(self.store._lock_fd)
+        self.assertIsNone(self.store._lock_fd)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,207 @@
+"""
+Tests of the Batch API helpers against a local stand-in for the files and batches endpoints.
+
+Run from src/frontend with: python -m pytest tests (or python -m unittest discover tests)
+"""
+
+import io
+import json
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from types import SimpleNamespace
+from unittest import mock
+
+from batch_api import BATCH_MAX_POLL_ERRORS, BatchWriter, run_batch
+
+
+class FakeBatchClient:
+    """
+    In-memory stand-in for the `files` and `batches` endpoints of the Azure OpenAI client.
+
+    A batch stays in progress for `polls_before_done` status checks. The content of each
+    completion is returned by `respond(custom_id, body)`, and the requests it returns None for
+    end up in the error file. By default, requests whose body has "fail": True fail. An input
+    file containing "reject" makes the whole batch fail with `errors`, as Azure does for an
+    invalid input file. The first `transient_errors` calls to `retrieve` and to `content` raise.
+    """
+
+    def __init__(self, polls_before_done=2, respond=None, transient_errors=0):
+        self.polls_before_done = polls_before_done
+        self.respond = respond or self._default_response
+        self.transient_errors = {"retrieve": transient_errors, "content": transient_errors}
+        self.uploaded = {}
+        self.batches_created = {}
+        self.cancelled = []
+        self.polls = {}
+        self.files = SimpleNamespace(create=self._create_file, content=self._file_content)
+        self.batches = SimpleNamespace(create=self._create_batch, retrieve=self._retrieve_batch,
+                                       cancel=self._cancel_batch)
+
+    @staticmethod
+    def _default_response(custom_id, body):
+        return None if body.get("fail") else f"result of {custom_id}"
+
+    def _maybe_fail(self, endpoint):
+        if self.transient_errors[endpoint] > 0:
+            self.transient_errors[endpoint] -= 1
+            raise ConnectionError(f"Transient {endpoint} error")
+
+    def _create_file(self, file, purpose):
+        assert purpose == "batch"
+        file_id = f"file-{len(self.uploaded)}"
+        self.uploaded[file_id] = file.read().decode("utf-8")
+        return SimpleNamespace(id=file_id)
+
+    def _file_content(self, file_id):
+        self._maybe_fail("content")
+        return SimpleNamespace(text=self.uploaded[file_id])
+
+    def _create_batch(self, input_file_id, endpoint, completion_window):
+        assert endpoint == "/chat/completions"
+        batch_id = f"batch-{len(self.batches_created)}"
+        self.batches_created[batch_id] = input_file_id
+        self.polls[batch_id] = 0
+        return SimpleNamespace(id=batch_id)
+
+    def _cancel_batch(self, batch_id):
+        self.cancelled.append(batch_id)
+
+    def _retrieve_batch(self, batch_id):
+        self._maybe_fail("retrieve")
+        self.polls[batch_id] += 1
+        if self.polls[batch_id] <= self.polls_before_done:
+            return SimpleNamespace(id=batch_id, status="in_progress")
+
+        input_text = self.uploaded[self.batches_created[batch_id]]
+        if "reject" in input_text:
+            error = SimpleNamespace(code="invalid_request", message="Invalid input file", line=1)
+            return SimpleNamespace(id=batch_id, status="failed", errors=SimpleNamespace(data=[error]),
+                                   output_file_id=None, error_file_id=None)
+
+        output_lines, error_lines = [], []
+        for line in input_text.splitlines():
+            request = json.loads(line)
+            content = self.respond(request["custom_id"], request["body"])
+            if content is None:
+                error_lines.append(json.dumps({
+                    "custom_id": request["custom_id"],
+                    "response": {"status_code": 400, "body": {"error": {"message": "Bad request"}}},
+                    "error": None,
+                }))
+            else:
+                output_lines.append(json.dumps({
+                    "custom_id": request["custom_id"],
+                    "response": {"status_code": 200, "body": {
+                        "choices": [{"message": {"content": content}}],
+                    }},
+                    "error": None,
+                }))
+
+        output_file_id = self._store("\n".join(output_lines)) if output_lines else None
+        error_file_id = self._store("\n".join(error_lines)) if error_lines else None
+        return SimpleNamespace(id=batch_id, status="completed", errors=None,
+                               output_file_id=output_file_id, error_file_id=error_file_id)
+
+    def _store(self, text):
+        file_id = f"file-{len(self.uploaded)}"
+        self.uploaded[file_id] = text
+        return file_id
+
+
+class RunBatchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.batch_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.batch_dir, ignore_errors=True)
+
+    def test_results_are_mapped_back_across_split_files(self):
+        client = FakeBatchClient()
+        writer = BatchWriter(self.batch_dir, max_file_mb=0.001)
+        for idx in range(10):
+            writer.add(f"caption|{idx}", {"model": "gpt-4o", "messages": [{"role": "user", "content": "x" * 200}]})
+        writer.add("ocr|failing", {"model": "gpt-4o", "fail": True})
+
+        with redirect_stdout(io.StringIO()) as output:
+            results = run_batch(writer, client, poll_secs=0)
+
+        self.assertGreater(len(writer.batch_files), 1)
+        self.assertEqual(len(client.batches_created), len(writer.batch_files))
+        self.assertEqual(results["ocr|failing"], None)
+        for idx in range(10):
+            self.assertEqual(results[f"caption|{idx}"], f"result of caption|{idx}")
+        self.assertIn("Request ocr|failing failed", output.getvalue())
+
+    def test_input_files_are_valid_jsonl(self):
+        writer = BatchWriter(self.batch_dir)
+        writer.add("steps|0", {"model": "gpt-4o", "messages": []})
+        writer.close()
+
+        with open(writer.batch_files[0], encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual(lines, [{
+            "custom_id": "steps|0",
+            "method": "POST",
+            "url": "/chat/completions",
+            "body": {"model": "gpt-4o", "messages": []},
+        }])
+
+    def test_failed_batch_errors_are_reported(self):
+        client = FakeBatchClient(polls_before_done=0)
+        writer = BatchWriter(self.batch_dir)
+        writer.add("steps|0", {"model": "gpt-4o", "reject": True})
+
+        with redirect_stdout(io.StringIO()) as output:
+            results = run_batch(writer, client, poll_secs=0)
+
+        self.assertEqual(results, {"steps|0": None})
+        self.assertIn("invalid_request Invalid input file (line 1)", output.getvalue())
+
+    def test_transient_polling_errors_are_retried(self):
+        client = FakeBatchClient(transient_errors=3)
+        writer = BatchWriter(self.batch_dir)
+        writer.add("steps|0", {"model": "gpt-4o"})
+
+        with redirect_stdout(io.StringIO()) as output:
+            results = run_batch(writer, client, poll_secs=0)
+
+        self.assertEqual(results, {"steps|0": "result of steps|0"})
+        self.assertIn("Transient retrieve error", output.getvalue())
+        self.assertIn("Transient content error", output.getvalue())
+        self.assertEqual(client.cancelled, [])
+
+    def test_batch_is_given_up_after_repeated_polling_errors(self):
+        client = FakeBatchClient(transient_errors=BATCH_MAX_POLL_ERRORS)
+        writer = BatchWriter(self.batch_dir)
+        writer.add("steps|0", {"model": "gpt-4o"})
+
+        with redirect_stdout(io.StringIO()):
+            results = run_batch(writer, client, poll_secs=0)
+
+        self.assertEqual(results, {"steps|0": None})
+        self.assertEqual(client.cancelled, ["batch-0"])
+
+    def test_pending_batches_are_cancelled_on_abort(self):
+        client = FakeBatchClient(polls_before_done=100)
+        writer = BatchWriter(self.batch_dir, max_file_mb=0.0001)
+        writer.add("steps|0", {"model": "gpt-4o", "messages": "x" * 100})
+        writer.add("steps|1", {"model": "gpt-4o", "messages": "x" * 100})
+
+        with mock.patch("batch_api.time.sleep", side_effect=KeyboardInterrupt), \
+             redirect_stdout(io.StringIO()):
+            with self.assertRaises(KeyboardInterrupt):
+                run_batch(writer, client, poll_secs=0)
+
+        self.assertEqual(client.cancelled, ["batch-0", "batch-1"])
+
+    def test_empty_batch(self):
+        client = FakeBatchClient()
+        self.assertEqual(run_batch(BatchWriter(self.batch_dir), client, poll_secs=0), {})
+        self.assertEqual(client.batches_created, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+"""
+Tests of the bulk generation of the checklist documents against a local stand-in Batch API client.
+"""
+
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+import cv2
+import numpy as np
+from docx import Document
+
+import helpers
+from helpers import TICKS_PER_SECOND, WordStore, batch_checklist_docx_files
+from test_batch_api import FakeBatchClient
+
+
+def write_video(video_file, secs=10, fps=10):
+    writer = cv2.VideoWriter(video_file, cv2.VideoWriter_fourcc(*"MJPG"), fps, (32, 24))
+    for idx in range(secs * fps):
+        writer.write(np.full((24, 32, 3), idx % 256, dtype=np.uint8))
+    writer.release()
+
+
+def make_words(words):
+    store = WordStore()
+    store.append_batch([
+        {"Word": word, "Offset": round(secs * TICKS_PER_SECOND), "Duration": 1_000_000, "Confidence": 0.9}
+        for word, secs in words
+    ])
+    return store
+
+
+STEPS = {"Steps": [
+    {"Step": 1, "Title": "check", "Summary": "Check it", "Keywords": "check", "Offset_in_secs": 0.0},
+    {"Step": 2, "Title": "close", "Summary": "Close it", "Keywords": "close", "Offset_in_secs": 5.0},
+]}
+
+
+def respond(custom_id, body):
+    kind = custom_id.split("|")[0]
+    if custom_id == "steps|0":
+        return json.dumps(STEPS)
+    if kind == "steps":
+        return '{"Steps": [{"Step": 1'  # truncated completion
+    if custom_id == "caption|0|1|1":
+        return None  # failed request
+    return f"result of {custom_id}"
+
+
+class BatchChecklistTest(unittest.TestCase):
+
+    def setUp(self):
+        self.results_dir = tempfile.mkdtemp()
+        self.videos = []
+        for idx in range(2):
+            video_file = os.path.join(self.results_dir, f"video{idx}.avi")
+            write_video(video_file)
+            self.videos.append((video_file, make_words([("hello", 1.0), ("world", 6.0)])))
+
+    def tearDown(self):
+        shutil.rmtree(self.results_dir)
+        helpers._MEDIA_INDEX_CACHE.clear()
+        helpers._MEDIA_INDEX_FAILURES.clear()
+
+    def test_documents_are_assembled_from_the_batch_results(self):
+        client = FakeBatchClient(respond=respond)
+        # Without keyframes, frames are read by position and the index is not written to disk
+        with mock.patch.object(helpers, "_probe_keyframes", return_value=None), \
+             redirect_stdout(io.StringIO()) as output:
+            docx_files = batch_checklist_docx_files(self.videos, self.results_dir, 2, client=client, poll_secs=0)
+
+        # The second video has an invalid step structure
+        self.assertIsNone(docx_files[1])
+        self.assertIn("Invalid step structure for", output.getvalue())
+        self.assertEqual(len(client.batches_created), 2)
+
+        # Frames are taken 3 s apart after each step offset, and the one at 11 s is past the end
+        vision_ids = sorted(
+            json.loads(line)["custom_id"]
+            for file_id in client.batches_created.values()
+            for line in client.uploaded[file_id].splitlines()
+            if not line.startswith('{"custom_id": "steps')
+        )
+        self.assertEqual(vision_ids, sorted(
+            f"{kind}|0|{frame}" for kind in ("caption", "ocr") for frame in ("0|1", "0|2", "1|1")))
+
+        document = Document(docx_files[0])
+        paragraphs = [paragraph.text for paragraph in document.paragraphs]
+        self.assertEqual(len(document.inline_shapes), 3)
+        self.assertEqual([text for text in paragraphs if text.startswith("- Automatic")], [
+            "- Automatic frame caption: result of caption|0|0|1",
+            "- Automatic OCR: result of ocr|0|0|1",
+            "- Automatic frame caption: result of caption|0|0|2",
+            "- Automatic OCR: result of ocr|0|0|2",
+            "- Automatic frame caption: (not available)",
+            "- Automatic OCR: result of ocr|0|1|1",
+        ])
+        self.assertEqual([text for text in paragraphs if text.startswith("Audio Transcript")],
+                         ["Audio Transcript: hello", "Audio Transcript: world"])
+
+        # The frames are removed once the document is written
+        self.assertFalse(os.path.exists(os.path.join(self.results_dir, "frames", "0")))
+
+
+if __name__ == "__main__":
+    unittest.main()
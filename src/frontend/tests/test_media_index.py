@@ -0,0 +1,72 @@
+"""
+Tests of the media index of the video files.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import cv2
+import numpy as np
+
+import helpers
+
+
+def write_video(video_file, nb_frames=10, fps=10):
+    writer = cv2.VideoWriter(video_file, cv2.VideoWriter_fourcc(*"MJPG"), fps, (32, 24))
+    for idx in range(nb_frames):
+        writer.write(np.full((24, 32, 3), idx * 20, dtype=np.uint8))
+    writer.release()
+
+
+class MediaIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.video_file = os.path.join(self.tmp_dir, "video.avi")
+        self.index_dir = os.path.join(self.tmp_dir, "index")
+        write_video(self.video_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+        helpers._MEDIA_INDEX_CACHE.clear()
+        helpers._MEDIA_INDEX_FAILURES.clear()
+
+    def test_index_is_cached_and_persisted(self):
+        with mock.patch.object(helpers, "_probe_keyframes", return_value=[0.0, 0.5]) as probe:
+            media_index = helpers.get_media_index(self.video_file, self.index_dir)
+            self.assertEqual(media_index["keyframes"], [0.0, 0.5])
+            self.assertEqual(media_index["total_frames"], 10)
+            helpers._MEDIA_INDEX_CACHE.clear()
+            self.assertEqual(helpers.get_media_index(self.video_file, self.index_dir), media_index)
+        probe.assert_called_once()
+
+    def test_failed_probe_is_retried_only_after_the_delay(self):
+        with mock.patch.object(helpers, "_probe_keyframes", return_value=None) as probe:
+            media_index = helpers.get_media_index(self.video_file, self.index_dir)
+            self.assertEqual(media_index["keyframes"], [])
+            self.assertIs(helpers.get_media_index(self.video_file, self.index_dir), media_index)
+            probe.assert_called_once()
+            self.assertFalse(os.path.isdir(self.index_dir) and os.listdir(self.index_dir))
+
+        # Once the delay is over, the probe runs again and a success clears the failure
+        failure = helpers._MEDIA_INDEX_FAILURES
+        key = next(iter(failure))
+        failure[key] = (0.0, failure[key][1])
+        with mock.patch.object(helpers, "_probe_keyframes", return_value=[0.0]) as probe:
+            self.assertEqual(helpers.get_media_index(self.video_file, self.index_dir)["keyframes"], [0.0])
+            probe.assert_called_once()
+        self.assertEqual(helpers._MEDIA_INDEX_FAILURES, {})
+
+    def test_frame_falls_back_to_frame_position_without_keyframes(self):
+        frames_dir = os.path.join(self.tmp_dir, "frames")
+        os.makedirs(frames_dir)
+        with mock.patch.object(helpers, "_probe_keyframes", return_value=None):
+            frame_file = helpers.get_video_frame(self.video_file, 0.5, frames_dir)
+        self.assertTrue(os.path.isfile(frame_file))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+"""
+Tests of the incremental parsing of the streamed step-structure completions.
+"""
+
+import json
+import unittest
+
+from helpers import StepStreamParser, stream_steps
+
+COMPLETION = json.dumps({
+    "Title": "Steps {of} the \"SOP\" [draft]",
+    "Steps": [
+        {"Step": "Open the \"valve\" {A}", "Offset_in_secs": 1.5, "Details": {"Tools": ["wrench", "}"]}},
+        {"Step": "Escaped \\\" backslash \\\\", "Offset_in_secs": 4.0},
+        {"Step": "Close ] the [ valve", "Offset_in_secs": 7.25},
+    ],
+})
+
+
+class StepStreamTest(unittest.TestCase):
+
+    def test_items_are_emitted_as_they_close(self):
+        parser = StepStreamParser()
+        end_first = COMPLETION.index("}}") + 2
+        self.assertEqual(parser.feed(COMPLETION[:end_first - 1]), [])
+        self.assertEqual(parser.feed(COMPLETION[end_first - 1:end_first]),
+                         [json.loads(COMPLETION)["Steps"][0]])
+
+    def test_every_chunk_boundary(self):
+        expected = json.loads(COMPLETION)["Steps"]
+        for pos in range(len(COMPLETION) + 1):
+            with self.subTest(pos=pos):
+                self.assertEqual(list(stream_steps([COMPLETION[:pos], COMPLETION[pos:]])), expected)
+
+    def test_single_character_chunks(self):
+        self.assertEqual(list(stream_steps(COMPLETION)), json.loads(COMPLETION)["Steps"])
+
+    def test_nested_steps_key_is_ignored(self):
+        completion = json.dumps({
+            "Meta": {"Steps": [{"Step": "nested"}]},
+            "Steps": [{"Step": "top", "Sub": {"Steps": [{"Step": "inner"}]}}],
+        })
+        parser = StepStreamParser()
+        items = [item for char in completion for item in parser.feed(char)]
+        self.assertEqual(items, [{"Step": "top", "Sub": {"Steps": [{"Step": "inner"}]}}])
+        self.assertEqual(list(stream_steps([completion])), items)
+
+    def test_non_object_items_are_not_duplicated(self):
+        self.assertEqual(list(stream_steps(['{"Steps":[1,{"Step":2}]}'])), [{"Step": 2}, 1])
+        self.assertEqual(list(stream_steps(['{"Steps":[{"Step":1},"x",[{"a":1}],{"Step":2}]}'])),
+                         [{"Step": 1}, {"Step": 2}, "x", [{"a": 1}]])
+
+    def test_truncated_completion_raises(self):
+        truncated = COMPLETION[:COMPLETION.index("Close")]
+        steps = stream_steps([truncated])
+        self.assertEqual([next(steps), next(steps)], json.loads(COMPLETION)["Steps"][:2])
+        with self.assertRaisesRegex(ValueError, "after 2 steps"):
+            next(steps)
+
+
+if __name__ == "__main__":
+    unittest.main()
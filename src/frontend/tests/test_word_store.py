@@ -0,0 +1,117 @@
+"""
+Tests of the columnar word store of the transcription results.
+"""
+
+import math
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from helpers import TICKS_PER_SECOND, WordListView, WordStore
+
+
+def make_words(start, count):
+    return [
+        {"Word": f"word{idx % 3}", "Offset": idx * 1_000_000, "Duration": 500_000, "Confidence": 0.5}
+        for idx in range(start, start + count)
+    ]
+
+
+class WordStoreTest(unittest.TestCase):
+
+    def test_append_batches_grows_the_columns(self):
+        store = WordStore(capacity=2)
+        for batch_idx in range(5):
+            store.append_batch(make_words(batch_idx * 3, 3))
+        store.append_batch([])
+
+        self.assertEqual(len(store), 15)
+        self.assertGreaterEqual(len(store._codes), 15)
+        self.assertEqual(store.offsets.tolist(), [idx * 1_000_000 for idx in range(15)])
+        self.assertEqual(store.words.tolist(), [f"word{idx % 3}" for idx in range(15)])
+        # Words are interned
+        self.assertEqual(store._vocab, ["word0", "word1", "word2"])
+        self.assertEqual(store.offsets.dtype, np.int64)
+        self.assertEqual(store.durations.dtype, np.int64)
+
+    def test_in_secs_columns_are_computed_from_ticks(self):
+        store = WordStore()
+        store.append_batch([{"Word": "hello", "Offset": 5_900_000, "Duration": 3_000_000, "Confidence": 0.9}])
+
+        self.assertEqual(store.offsets_in_secs.tolist(), [5_900_000 / TICKS_PER_SECOND])
+        self.assertEqual(store.durations_in_secs.tolist(), [0.3])
+
+    def test_to_dataframe_does_not_copy_numeric_columns(self):
+        store = WordStore()
+        store.append_batch(make_words(0, 10))
+        df = store.to_dataframe()
+
+        self.assertEqual(list(df.columns),
+                         ["Word", "Offset", "Duration", "Confidence", "Offset_in_secs", "Duration_in_secs"])
+        self.assertTrue(np.shares_memory(df["Offset"].to_numpy(), store.offsets))
+        self.assertTrue(np.shares_memory(df["Duration"].to_numpy(), store.durations))
+        self.assertEqual(df["Word"].tolist(), store.words.tolist())
+        self.assertEqual(list(store.to_dataframe(in_secs=False).columns), WordStore.COLUMNS)
+
+    def test_list_view_matches_the_former_list_of_dicts(self):
+        words = [
+            {"Word": "hello", "Offset": 10, "Duration": 5, "Confidence": 0.75},
+            {"Word": "world", "Offset": 20, "Duration": 5},
+        ]
+        store = WordStore()
+        store.append_batch(words)
+        view = store.as_list()
+
+        self.assertIsInstance(view, WordListView)
+        self.assertEqual(len(view), 2)
+        self.assertEqual(view[0], words[0])
+        self.assertEqual(view[-1]["Word"], "world")
+        # A word without confidence comes back with a NaN confidence
+        self.assertTrue(math.isnan(view[1]["Confidence"]))
+        self.assertEqual([item["Word"] for item in view[:2]], ["hello", "world"])
+        with self.assertRaises(IndexError):
+            view[2]
+
+        df = pd.DataFrame(view, columns=WordStore.COLUMNS)
+        self.assertEqual(df["Offset"].tolist(), [10, 20])
+
+
+class WordStoreCsvTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_read_csv_round_trip(self):
+        store = WordStore()
+        store.append_batch([
+            {"Word": "null", "Offset": 10, "Duration": 5, "Confidence": 0.9},
+            {"Word": "nan", "Offset": 20, "Duration": 5},
+            {"Word": "NA", "Offset": 30, "Duration": 7, "Confidence": 0.123456789},
+            {"Word": "null", "Offset": 40, "Duration": 7, "Confidence": 0.5},
+        ])
+        csv_file = os.path.join(self.tmp_dir, "transcript.txt")
+        store.to_dataframe().to_csv(csv_file)
+
+        loaded = WordStore.read_csv(csv_file)
+
+        self.assertEqual(loaded.words.tolist(), ["null", "nan", "NA", "null"])
+        self.assertEqual(loaded.offsets.tolist(), [10, 20, 30, 40])
+        self.assertTrue(math.isnan(loaded.confidences[1]))
+        self.assertAlmostEqual(loaded.confidences[2], 0.123456789)
+        pd.testing.assert_frame_equal(loaded.to_dataframe(), store.to_dataframe())
+
+        # The loaded store can still be appended to
+        loaded.append_batch([{"Word": "nan", "Offset": 50, "Duration": 1, "Confidence": 1.0}])
+        self.assertEqual(loaded.words.tolist()[-1], "nan")
+        self.assertEqual(len(loaded._vocab), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
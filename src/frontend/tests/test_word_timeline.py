@@ -0,0 +1,69 @@
+"""
+Tests of the word timeline and of the step transcripts built from it.
+"""
+
+import unittest
+
+from helpers import TICKS_PER_SECOND, WordStore, WordTimeline, fill_step_transcripts
+
+
+def make_timeline(words):
+    store = WordStore()
+    store.append_batch([
+        {"Word": word, "Offset": round(secs * TICKS_PER_SECOND), "Duration": 1_000_000, "Confidence": 0.9}
+        for word, secs in words
+    ])
+    return WordTimeline(store)
+
+
+class WordTimelineTest(unittest.TestCase):
+
+    def setUp(self):
+        # Appended out of order, as results of overlapping recognitions could be
+        self.timeline = make_timeline([
+            ("one", 0.5), ("two", 1.0), ("four", 3.0), ("three", 2.0), ("five", 4.5),
+        ])
+
+    def test_text_between_is_half_open(self):
+        self.assertEqual(self.timeline.text_between(0.0), "one two three four five")
+        self.assertEqual(self.timeline.text_between(1.0, 3.0), "two three")
+        self.assertEqual(self.timeline.text_between(1.0, 1.0), "")
+        self.assertEqual(self.timeline.text_between(5.0), "")
+
+    def test_text_between_rounds_seconds_to_ticks(self):
+        # 0.1 + 0.2 is slightly above 0.3 as a float
+        timeline = make_timeline([("a", 0.3), ("b", 0.6)])
+        self.assertEqual(timeline.text_between(0.1 + 0.2, 0.6), "a")
+
+    def test_text_between_ticks(self):
+        self.assertEqual(self.timeline.text_between_ticks(10_000_000, 30_000_001), "two three four")
+
+    def test_step_transcripts_follow_the_next_larger_start(self):
+        steps = [
+            {"Step": "b", "Offset_in_secs": 2.0},
+            {"Step": "a", "Offset_in_secs": 0.0},
+            {"Step": "a bis", "Offset_in_secs": 0.0},
+            {"Step": "c", "Offset_in_secs": 4.0},
+        ]
+        fill_step_transcripts(steps, self.timeline)
+        self.assertEqual([step["Audio Transcript"] for step in steps],
+                         ["three four", "one two", "one two", "five"])
+
+    def test_step_transcripts_use_integer_offsets(self):
+        # Offset_in_secs is rounded to 1.0, which would include "two"
+        steps = [
+            {"Step": "a", "Offset": 0, "Offset_in_secs": 0.0},
+            {"Step": "b", "Offset": 10_000_001, "Offset_in_secs": 1.0},
+        ]
+        fill_step_transcripts(steps, self.timeline)
+        self.assertEqual([step["Audio Transcript"] for step in steps],
+                         ["one two", "three four five"])
+
+    def test_step_transcripts_without_words(self):
+        steps = [{"Step": "a", "Offset_in_secs": 0.0}]
+        fill_step_transcripts(steps, make_timeline([]))
+        self.assertEqual(steps[0]["Audio Transcript"], "")
+
+
+if __name__ == "__main__":
+    unittest.main()